@@ -1,9 +1,26 @@
 #!/usr/bin/python3
 
-from itertools import zip_longest
-from functools import partial, wraps
+from itertools import zip_longest, chain, repeat, islice, accumulate
+from functools import partial, wraps, lru_cache, update_wrapper, reduce
+from collections import Counter, namedtuple
+from collections.abc import Sequence, MutableSequence
+from contextlib import contextmanager
+from time import perf_counter, time_ns
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import asyncio
+import copy
+import hashlib
+import importlib
+import math
 import operator
 import inspect
+import mmap
+import os
+import pickle
+import random
+import sqlite3
 
 
 _DUNDER = {
@@ -15,147 +32,1525 @@ _DUNDER = {
 
 DEFAULT_MODE = "flat"
 
+# shared thread pool for proxied method calls and unary operators, see multo_threads()
+_THREADS = None
+
+# statistics collected while profiling is on, see multo_profile()
+_STATS = None
+
+# expanders of the operators applied by multo_list, see _operator_expander()
+_EXPANDERS = {}
+
+# proxies of item attributes per (item type, attribute name), see _type_proxy()
+_PROXIES = {}
+_PROXIES_MAX = 4096
+
+_instance_dict = operator.attrgetter("__dict__")
+
+# multo positions per tuple of argument types, see _signature()
+_SIGNATURES = {}
+_SIGNATURES_MAX = 4096
+
+# signature of arguments holding no multo
+_SCALAR = ((), False)
+
+# compiled adapters of calls with fixed positional arguments, see _binder()
+_BINDERS = {}
+
+# operators nested in a multo_lazy expression before it is evaluated, fused ones
+# are a Python frame deep each, unevaluated lazy sources a handful
+_FUSE_DEPTH = 100
+
+# operators which may modify the elements they are applied to
+_MUTATING = (operator.delitem, operator.iadd, operator.iand, operator.ifloordiv, operator.ilshift, operator.imod, operator.imul,
+             operator.ior, operator.ipow, operator.irshift, operator.isub, operator.itruediv, operator.ixor, operator.setitem)
+
+# array typecodes of the element types packed into buffers, see _pack()
+_TYPECODES = {int: 'q', float: 'd'}
+
+# storage types holding numbers only, applied operators run as a single map() over them
+_NUMBERS = (array, memoryview, range)
+
+# statistics of a function decorated with persist, see multo_decor()
+_PersistInfo = namedtuple("PersistInfo", "hits misses limit entries size")
+
+# pickle protocol of the stored argument keys, fixed to keep keys across Python versions
+_PERSIST_PROTOCOL = 4
+
+# keys looked up per query, under the SQLite limit of query parameters
+_PERSIST_CHUNK = 900
+
 
 class Neq():
     def __eq__(self, other):
         return False
 
 
-def zip_equal(*iterables):
-    sentinel=Neq()
-    return zip_longest(*iterables, fillvalue=sentinel)
+def zip_equal(*iterables):
+    sentinel=Neq()
+    return zip_longest(*iterables, fillvalue=sentinel)
+
+
+def _pack(values):
+    '''
+    Store a list of homogeneous int or float values in a typed array,
+    anything else (mixed types, bools, ints out of range) stays a list.
+    Used where a buffer is needed (pickling, frozen multos): computed
+    values stay in lists, which map() reads without boxing them again.
+    '''
+    types = set(map(type, values))
+    if len(types) == 1:
+        typecode = _TYPECODES.get(types.pop())
+        if typecode is not None:
+            try:
+                return array(typecode, values)
+            except OverflowError:
+                pass
+    return values
+
+
+def _resolve_mode(*multos):
+    modes = list(dict.fromkeys(mode for mode in map(_mode, multos) if mode is not None))
+    if not modes:
+        return DEFAULT_MODE
+    elif len(modes) == 1:
+        return modes[0]
+    raise AttributeError(f"Incompatible multo types {' and '.join(modes)}")
+
+
+def _numeric_unary(a, op):
+    return multo_list._multo_new(list(map(op, a.multo)))
+
+
+def _numeric_binary(a, b, op):
+    '''
+    Array-backed counterpart of the multo_decor expansion: the whole operation
+    runs as a single map() over the buffers instead of one expander call per element.
+    Returns None when b is neither a number nor an array-backed multo.
+    '''
+    x = a.multo
+
+    if type(b) in _TYPECODES:
+        return multo_list._multo_new(list(map(op, x, repeat(b))))
+
+    if not isinstance(b, multo_list) or type(b.multo) not in _NUMBERS:
+        return None
+
+    y = b.multo
+    mode = a.multo_mode or _resolve_mode(a, b)
+
+    if mode == "flat":
+        # outer product, the first operand varies fastest
+        return multo_list._multo_new(list(map(op, *_flat_columns([x, y]))))
+
+    elif mode == "nest":
+        return multo_list._multo_new(list(map(op, *_flat_columns([x, y]))), shape=(len(y), len(x)))
+
+    elif mode == "zip":
+        if len(x) != len(y):
+            raise IndexError("Non-equal length of zipped multos")
+        return multo_list._multo_new(list(map(op, x, y)))
+
+
+def _flat_product(values):
+    '''
+    Cartesian product of element sequences in flat mode ordering,
+    i.e. the first sequence varies fastest.
+    '''
+    return zip(*_flat_columns(values))
+
+
+def _flat_columns(values):
+    '''
+    Iterators over the items of each sequence in their cartesian product in flat
+    mode ordering: each item repeated for all the combinations of the sequences
+    before it, all that for all the combinations of the sequences after it.
+    '''
+    lengths = list(map(len, values))
+    columns = []
+    for i, v in enumerate(values):
+        inner, outer = math.prod(lengths[:i]), math.prod(lengths[i + 1:])
+        tiled = chain.from_iterable(repeat(v, outer))
+        columns.append(tiled if inner == 1 else chain.from_iterable(map(repeat, tiled, repeat(inner))))
+    return columns
+
+
+def _mapped(op, fns, counts):
+    '''
+    Column function of a multo_lazy expression: given the iterables of the
+    source elements, it maps op over the results of the column functions fns
+    of consecutive runs of counts sources, None for a single source passed
+    as it is. Fused operators are chained map() iterators, evaluated one
+    element at a time without intermediate lists or Python frames.
+    '''
+    if not any(fns):
+        return partial(_map_columns, op)
+
+    bounds = list(accumulate(counts, initial=0))
+    parts = list(zip(fns, bounds, bounds[1:]))
+
+    def mapped(columns):
+        return map(op, *[fn(columns[start:end]) if fn else columns[start] for fn, start, end in parts])
+
+    return mapped
+
+
+def _map_columns(op, columns):
+    return map(op, *columns)
+
+
+def _mapped_scalar(op, fn, other):
+    '''
+    Column function mapping op over the results of fn, or the single source,
+    and the scalar other.
+    '''
+    def mapped(columns):
+        return map(op, fn(columns) if fn else columns[0], repeat(other))
+
+    return mapped
+
+
+def multo_threads(workers=None):
+    '''
+    Dispatch method calls proxied to multo items and unary operators
+    to a shared pool of worker threads, workers=0 switches back to serial calls.
+    Worth it for items whose methods release the GIL (hashing, compression, I/O).
+    '''
+    global _THREADS
+
+    if _THREADS is not None:
+        _THREADS.shutdown()
+        _THREADS = None
+
+    if workers != 0:
+        _THREADS = ThreadPoolExecutor(workers)
+
+
+def _mean(values):
+    if not len(values):
+        raise ValueError("Mean of an empty multo")
+    return sum(values) / len(values)
+
+
+def _reflect(op):
+    def reflected(x, y):
+        return op(y, x)
+    reflected.__name__ = reflected.__qualname__ = "r" + op.__name__
+    return reflected
+
+
+_radd = _reflect(operator.add)
+_rsub = _reflect(operator.sub)
+_rmul = _reflect(operator.mul)
+_rtruediv = _reflect(operator.truediv)
+_rfloordiv = _reflect(operator.floordiv)
+_rmod = _reflect(operator.mod)
+_rdivmod = _reflect(divmod)
+_rpow = _reflect(operator.pow)
+_rand = _reflect(operator.and_)
+_ror = _reflect(operator.or_)
+_rxor = _reflect(operator.xor)
+_rlshift = _reflect(operator.lshift)
+_rrshift = _reflect(operator.rshift)
+
+
+def multo_profile(enable=True, callback=None):
+    '''
+    Start collecting call statistics of @multo decorated functions and multo
+    operators, returns the multo_stats object they are collected in.
+    The callback, if given, is called as callback(name, mode, elements, seconds, size)
+    after every call. multo_profile(False) stops collecting.
+    '''
+    global _STATS
+    _STATS = multo_stats(callback) if enable else None
+    return _STATS
+
+
+class multo_stats:
+    '''
+    Statistics per decorated function (by qualified name) and per operator
+    (by operator function name, e.g. "add", "radd", "neg"):
+
+        calls       number of calls
+        elements    number of element combinations the arguments expand to
+        seconds     total wall time
+        size        total length of the results
+        modes       Counter of the resolved modes (None for a single multo argument)
+
+    Elements and size are not counted for multo_lazy arguments and results,
+    which would have to be evaluated for it.
+    '''
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.records = {}
+
+    def __getitem__(self, name):
+        return self.records[name]
+
+    def __contains__(self, name):
+        return name in self.records
+
+    def names(self):
+        return list(self.records)
+
+    def reset(self):
+        self.records.clear()
+
+    def __str__(self):
+        lines = [f"{'name':30} {'calls':>8} {'elements':>10} {'seconds':>10} {'size':>10}  modes"]
+        for name, r in sorted(self.records.items()):
+            modes = ", ".join(f"{mode}: {count}" for mode, count in r["modes"].items())
+            lines.append(f"{name:30} {r['calls']:8} {r['elements']:10} {r['seconds']:10.6f} {r['size']:10}  {modes}")
+        return "\n".join(lines)
+
+    def _measure(self, name, args, mode, call):
+        start = perf_counter()
+        result = call()
+        if inspect.iscoroutine(result):
+            return self.__measure_async(name, args, mode, result, start)
+        self.__record(name, args, mode, perf_counter() - start, result)
+        return result
+
+    async def __measure_async(self, name, args, mode, coroutine, start):
+        result = await coroutine
+        self.__record(name, args, mode, perf_counter() - start, result)
+        return result
+
+    def __record(self, name, args, mode, seconds, result):
+        mode, elements = _expansion(args, mode)
+        size = _size(result)
+
+        record = self.records.get(name)
+        if record is None:
+            record = self.records[name] = dict(calls=0, elements=0, seconds=0.0, size=0, modes=Counter())
+
+        record["calls"] += 1
+        record["elements"] += elements or 0
+        record["seconds"] += seconds
+        record["size"] += size or 0
+        record["modes"][mode] += 1
+
+        if self.callback is not None:
+            self.callback(name, mode, elements, seconds, size)
+
+
+def _expansion(args, mode):
+    '''
+    Resolved mode and number of element combinations of the expanded arguments,
+    None when it cannot be known without evaluating a multo_lazy.
+    '''
+    multos = [arg for arg in args if isinstance(arg, multo_list)]
+
+    if any(map(_is_lazy, multos)):
+        return mode, None
+
+    if not multos:
+        return None, 1
+
+    lengths = [len(m.multo) for m in multos]
+
+    if len(multos) == 1:
+        return None, lengths[0]
+
+    mode = mode or _resolve_mode(*multos)
+    if mode == "zip":
+        return mode, lengths[0]
+    return mode, math.prod(lengths)
+
+
+def _size(result):
+    if _is_lazy(result):
+        return None
+    if isinstance(result, multo_list):
+        return len(result.multo)
+    return 1
+
+
+def _dispatcher(expander, f, mode):
+    '''
+    Entry point of a decorated function: arguments of types already known
+    to hold no multo go straight to f, the others to the expander.
+    '''
+    def decorated(*args, mode=mode, **kwargs):
+        if _STATS is None:
+            if (_SIGNATURES.get(tuple(map(type, args))) is _SCALAR
+                    and (not kwargs or _SIGNATURES.get(tuple(map(type, kwargs.values()))) is _SCALAR)):
+                return f(*args, **kwargs)
+            return expander(*args, mode=mode, **kwargs)
+        call = partial(expander, *args, mode=mode, **kwargs)
+        return _STATS._measure(expander.__qualname__, args + tuple(kwargs.values()), mode, call)
+
+    return decorated
+
+
+def multo_len(m):
+    return len(m.multo)
+
+
+def inner_len(m):
+    return m.multo_inner_len()
+
+def inner_bool(m):
+    return m.multo_inner_bool()
+
+def inner_int(m):
+    return m.multo_inner_int()
+
+def inner_bytes(m):
+    return m.multo_inner_bytes()
+
+def inner_complex(m):
+    return m.multo_inner_complex()
+
+
+def multo(*args, **kwargs):
+
+    if len(args) == 1 and _is_method(args[0]):
+        assert not kwargs
+        mode = args[0]
+        return multo_decor(mode)
+
+    elif not args and kwargs and "multo" not in kwargs:
+        return multo_decor(**kwargs)
+
+    else:
+        return multo_list(*args, **kwargs)
+
+
+def multo_open(path, typecode="d", writable=False, mode=None):
+    '''
+    Multo of the raw typecode values stored in a file, memory-mapped instead
+    of loaded. Writable maps let in-place operators update the file.
+    See multo_list.multo_dump().
+    '''
+    with open(path, "r+b" if writable else "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files cannot be mapped
+            return multo_list._multo_new(array(typecode), mode)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    return multo_list._multo_new(memoryview(mapped).cast(typecode), mode)
+
+
+class multo_product(Sequence):
+    '''
+    Cartesian product of multos in flat mode ordering, the first varying fastest,
+    as a sequence of combination tuples decoded from their index instead of stored:
+
+        p = multo_product(a, b, c)
+        len(p)                      # len(a) * len(b) * len(c)
+        p[123456789]                # (a item, b item, c item)
+        p[i::workers]               # shard for worker i, still virtual
+        p.sample(1000)              # random combinations
+
+    It is a Sequence, so multo(multo=p) is a multo of the combinations.
+    '''
+
+    __slots__ = ("values", "indexes")
+
+    def __init__(self, *multos):
+        self.values = [m.multo if isinstance(m, multo_list) else m for m in multos]
+        self.indexes = range(math.prod(map(len, self.values)))
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            shard = object.__new__(multo_product)
+            shard.values = self.values
+            shard.indexes = self.indexes[index]
+            return shard
+        return self.__decode(self.indexes[index])
+
+    def __decode(self, i):
+        combo = []
+        for v in self.values:
+            i, j = divmod(i, len(v))
+            combo.append(v[j])
+        return tuple(combo)
+
+    def __iter__(self):
+        indexes = self.indexes
+        # zip() of no columns is empty, the product of no multos is the empty combination
+        if indexes.start == 0 and indexes.step == 1 and self.values:
+            return islice(_flat_product(self.values), len(indexes))
+        return map(self.__decode, indexes)
+
+    def __contains__(self, combo):
+        try:
+            self.index(combo)
+        except ValueError:
+            return False
+        return True
+
+    def index(self, combo):
+        '''
+        Position of a combination, from the positions of its items.
+        '''
+        if len(combo) != len(self.values):
+            raise ValueError(f"{combo} is not in the product")
+        i = 0
+        for v, item in zip(reversed(self.values), reversed(combo)):
+            # memoryview storage has no index()
+            i = i * len(v) + operator.indexOf(v, item)
+        return self.indexes.index(i)
+
+    def sample(self, k, rng=random):
+        '''
+        k distinct random combinations.
+        '''
+        return [self[i] for i in rng.sample(range(len(self)), k)]
+
+
+class multo_store:
+    '''
+    SQLite file of the pickled results of functions decorated with persist,
+    keyed on the qualified name and version of the function and the pickled
+    argument combination. With a limit, the least recently used results are
+    evicted to keep the total size of the stored results under limit bytes.
+    '''
+
+    def __init__(self, path, limit=None):
+        self.path = os.fspath(path)
+        self.limit = limit
+        with self._transaction() as db:
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS results (function TEXT, version TEXT, key BLOB, value BLOB, used INTEGER,"
+                       " PRIMARY KEY (function, version, key))")
+            db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+    @contextmanager
+    def _transaction(self):
+        db = sqlite3.connect(self.path, timeout=60)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _lookup(self, function, version, keys):
+        '''
+        Stored values of the keys found, marked as used now.
+        '''
+        found = {}
+        with self._transaction() as db:
+            for i in range(0, len(keys), _PERSIST_CHUNK):
+                chunk = keys[i:i + _PERSIST_CHUNK]
+                found.update(db.execute("SELECT key, value FROM results WHERE function = ? AND version = ?"
+                                        f" AND key IN ({', '.join('?' * len(chunk))})", (function, version, *chunk)))
+            used = time_ns()
+            db.executemany("UPDATE results SET used = ? WHERE function = ? AND version = ? AND key = ?",
+                           ((used, function, version, key) for key in found))
+        return found
+
+    def _save(self, function, version, values):
+        '''
+        Store the (key, value) pairs, then evict down to the limit.
+        '''
+        used = time_ns()
+        with self._transaction() as db:
+            db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                           ((function, version, key, value, used) for key, value in values))
+            if self.limit is not None:
+                db.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM"
+                           " (SELECT rowid, SUM(length(value)) OVER (ORDER BY used DESC, rowid DESC) AS total FROM results)"
+                           " WHERE total > ?)", (self.limit,))
+
+    def _purge(self, function, version):
+        # results of the other versions of function
+        with self._transaction() as db:
+            db.execute("DELETE FROM results WHERE function = ? AND version != ?", (function, version))
+
+    def info(self, function=None):
+        '''
+        Number and total size in bytes of the results stored, of all functions
+        or of the one of the given qualified name.
+        '''
+        query = "SELECT COUNT(*), COALESCE(SUM(length(value)), 0) FROM results"
+        with self._transaction() as db:
+            if function is None:
+                return db.execute(query).fetchone()
+            return db.execute(query + " WHERE function = ?", (function,)).fetchone()
+
+    def clear(self, function=None):
+        '''
+        Remove the results of all functions or of the one of the given qualified name.
+        '''
+        with self._transaction() as db:
+            if function is None:
+                db.execute("DELETE FROM results")
+            else:
+                db.execute("DELETE FROM results WHERE function = ?", (function,))
+
+
+def multo_decor(*args, mode=None, workers=None, executor=None, concurrency=None, cache=None, batch=None, shared=None,
+                persist=None, version=None):
+    '''
+    Usage:
+
+    @multo_decor
+    def abc():
+        ...
+
+    @multo_decor('zip')
+    def abc():
+        ...
+
+    @multo_decor(mode='zip')
+    def abc():
+        ...
+
+    @multo
+    def abc():
+        ...
+
+    @multo(mode='zip')
+    def abc():
+        ...
+
+    @multo(mode='flat', workers=8)
+    def abc():
+        ...
+
+    With workers or executor given, the expanded combinations are computed
+    in a process pool (or the given concurrent.futures executor) in chunks.
+    The function must be defined at module level so that it can be pickled.
+
+    @multo(workers=8, shared="d")
+    def abc():
+        ...
+
+    Numeric results are written by the workers into a shared memory block as
+    values of the given array typecode, and the result multo is a view of it.
+
+    @multo(concurrency=16)
+    async def abc():
+        ...
+
+    Coroutine functions return an awaitable which runs all the expanded
+    combinations concurrently, at most concurrency of them at a time.
+
+    @multo(cache=1024)
+    def abc():
+        ...
+
+    Results are memoized per element combination in a LRU cache of the given
+    size (True for 128), see abc.cache_info() and abc.cache_clear().
+    Combinations with unhashable elements are always computed.
+
+    @multo(batch=10000)
+    def abc(xs, ys):
+        ...
+
+    Batched functions are called with columns: lists of the arguments of up to
+    batch combinations (True for all of them), and return as many results.
+
+    @multo(persist="results.db", workers=8)
+    def abc():
+        ...
+
+    Results are stored on disk per element combination, in a multo_store or
+    the SQLite file of the given path, and only the combinations not stored
+    yet are computed (in the pool, with workers or executor). The results are
+    those of the current version of the function, by default a digest of its
+    code: pass version to also invalidate them when the functions it calls
+    change. Closures are told apart by the values they close over, which must
+    be picklable unless version is given.
+    See abc.persist_info() and abc.persist_clear().
+    Combinations with unpicklable elements are always computed.
+    '''
+
+    options = dict(mode=mode, workers=workers, executor=executor, concurrency=concurrency, cache=cache, batch=batch, shared=shared,
+                   persist=persist, version=version)
+
+    if len(args) == 1 and callable(args[0]):
+        f = args[0]
+
+    elif len(args) == 0:
+        # called as @multo_decor() maybe with mode kw
+        return partial(multo_decor, **options)
+
+    elif len(args) == 1:
+        # called as @multo_decor(mode)
+        options["mode"] = args[0]
+        return partial(multo_decor, **options)
+
+    else:
+        raise ValueError("Invalid multo_decor arguments")
+
+    if mode is not None:
+        mode = mode[:4]
+        if mode.startswith("zip"):
+            mode = "zip"
+        assert mode in ("flat", "nest", "zip")
+
+    call = f
+
+    assert not shared or workers is not None or executor is not None
+
+    if inspect.iscoroutinefunction(f):
+        assert workers is None and executor is None and not cache and not batch and not persist
+        expander = _async_expander(f, concurrency)
+
+    elif batch:
+        assert workers is None and executor is None and not cache and not persist
+        # scalar calls make a batch of one too
+        expander = call = _batch_expander(f, None if batch is True else batch)
+
+    elif persist:
+        assert not cache and not shared
+        store = persist if isinstance(persist, multo_store) else multo_store(persist)
+        compute = _pool_task(f) if workers is None and executor is None else _pool_compute(f, workers, executor)
+        # scalar calls are stored too
+        expander = call = _persist_expander(f, store, version, compute)
+
+    elif workers is not None or executor is not None:
+        assert not cache
+        expander = _pool_expander(f, workers, executor, shared)
+
+    elif cache:
+        call = _memoize(f, 128 if cache is True else cache)
+        expander = _expander(call)
+
+    else:
+        # called as @multo_decor
+        expander = _expander(f)
+
+    decorated = update_wrapper(_dispatcher(expander, call, mode), f)
+
+    if cache:
+        decorated.cache_info = call.cache_info
+        decorated.cache_clear = call.cache_clear
+
+    if persist:
+        decorated.persist_info = call.persist_info
+        decorated.persist_clear = call.persist_clear
+
+    return decorated
+
+
+def _memoize(f, maxsize):
+
+    cached = lru_cache(maxsize, typed=True)(f)
+
+    @wraps(f)
+    def memoized(*args, **kwargs):
+        try:
+            hash((args, tuple(kwargs.values())))
+        except TypeError:
+            return f(*args, **kwargs)
+        return cached(*args, **kwargs)
+
+    memoized.cache_info = cached.cache_info
+    memoized.cache_clear = cached.cache_clear
+    return memoized
+
+
+def _persist_expander(f, store, version, compute):
+    '''
+    Expander looking up the results of all the combinations in the store at
+    once, computing the missing ones as compute(combos), each distinct one once.
+    '''
+
+    function = f"{f.__module__}.{f.__qualname__}"
+
+    # closures made by the same factory keep their results apart
+    closure = _closure_digest(f)
+    if closure is None and version is None:
+        raise TypeError(f"{f.__qualname__} closes over values which cannot be pickled, pass version to persist it")
+    if closure:
+        function += f"[{closure}]"
+    version = _code_version(f) if version is None else str(version)
+
+    counts = Counter()
+    purged = False
+
+    @wraps(f, updated=())
+    def expander(*args, mode=None, **kwargs):
+        nonlocal purged
+        if not purged:
+            store._purge(function, version)
+            purged = True
+
+        combos, structure = _plan(args, kwargs, mode)
+        keys = list(map(_persist_key, combos))
+        stored = store._lookup(function, version, [key for key in keys if key is not None])
+
+        # combinations without a key are computed every time they occur
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in stored:
+                missing.setdefault(i if key is None else key, i)
+        computed = dict(zip(missing, compute([combos[i] for i in missing.values()])))
+
+        values = []
+        for key, value in computed.items():
+            if type(key) is bytes:
+                try:
+                    values.append((key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+                except Exception:
+                    pass
+        if values:
+            store._save(function, version, values)
+
+        counts["hits"] += len(keys) - len(missing)
+        counts["misses"] += len(missing)
+
+        results = [pickle.loads(stored[key]) if key in stored else computed[i if key is None else key]
+                   for i, key in enumerate(keys)]
+        return _assemble(structure, results)
+
+    def persist_info():
+        return _PersistInfo(counts["hits"], counts["misses"], store.limit, *store.info(function))
+
+    def persist_clear():
+        store.clear(function)
+        counts.clear()
+
+    expander.persist_info = persist_info
+    expander.persist_clear = persist_clear
+    return expander
+
+
+def _persist_key(combo):
+    '''
+    Digest of an (args, kwargs) combination, None when it cannot be pickled.
+    '''
+    args, kwargs = combo
+    try:
+        data = pickle.dumps(_canonical((args, sorted(kwargs.items()))), _PERSIST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class _unordered(tuple):
+    # members of a set, see _canonical()
+    __slots__ = ()
+
+
+def _canonical(value):
+    '''
+    value with the sets in it (at any depth of tuples, lists and dicts) replaced
+    by their members in an order which, unlike their iteration order, does not
+    change with hash randomization, so that they pickle the same in every process.
+    '''
+    cls = type(value)
+    if cls is set or cls is frozenset:
+        return _unordered(sorted(map(_canonical, value), key=partial(pickle.dumps, protocol=_PERSIST_PROTOCOL)))
+    if cls is tuple or cls is list:
+        return cls(map(_canonical, value))
+    if cls is dict:
+        return {_canonical(key): _canonical(item) for key, item in value.items()}
+    return value
+
+
+def _closure_digest(f):
+    '''
+    Digest of the values f closes over, "" when there are none and None
+    when they cannot be pickled.
+    '''
+    cells = getattr(inspect.unwrap(f), "__closure__", None)
+    if not cells:
+        return ""
+    try:
+        data = pickle.dumps(_canonical([cell.cell_contents for cell in cells]), _PERSIST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _code_version(f):
+    '''
+    Digest of the code of f with its constants and defaults, which changes when
+    f is edited but not when it is just moved around in its file.
+    '''
+    def update(digest, code):
+        digest.update(code.co_code)
+        digest.update(repr((code.co_names, code.co_varnames)).encode())
+        for const in code.co_consts:
+            if inspect.iscode(const):
+                update(digest, const)
+            else:
+                digest.update(repr(_canonical(const)).encode())
+
+    digest = hashlib.blake2b(digest_size=8)
+    f = inspect.unwrap(f)
+    code = getattr(f, "__code__", None)
+    if code is not None:
+        update(digest, code)
+    digest.update(repr(_canonical((getattr(f, "__defaults__", None), getattr(f, "__kwdefaults__", None)))).encode())
+    return digest.hexdigest()
+
+
+def _expander(f, lazy=True):
+    '''
+    Returns a function broadcasting f over all its multo arguments, positional
+    and keyword, in a single pass over their combined index space:
+
+        flat    cartesian product, the first multo argument varies fastest
+        nest    multo of multos, the first multo argument innermost
+        zip     elementwise, the multos must be of equal length
+
+    Items which are multos themselves are expanded recursively.
+    '''
+
+    # side effects on the elements must not be deferred to multo_lazy evaluation
+    deferrable = lazy and f not in _MUTATING
+
+    @wraps(f, updated=())
+    def expander(*args, mode=None, **kwargs):
+
+        axes, keys, lazy_args = _axes(args, kwargs)
+
+        if not axes and not keys:
+            return f(*args, **kwargs)
+
+        multos = [args[i] for i in axes] + [kwargs[key] for key in keys]
+
+        if deferrable and lazy_args:
+            deferred = _defer(f, args, axes, kwargs, keys, multos, mode)
+            if deferred is not None:
+                return deferred
+
+        values, mode, shape = _broadcast(multos, mode, lazy_args)
+
+        call = f
+        if _nested(values):
+            call = partial(expander, mode=mode)
+
+        if len(axes) < len(args) or kwargs:
+            call = _bind(call, args, axes, kwargs, keys)
+
+        columns, shape = _columns(values, mode, shape)
+        if len(values) == 1 and type(values[0]) is _categories:
+            # once per distinct value
+            result = _categories(list(map(call, values[0].values)), values[0].codes)
+        else:
+            result = list(map(call, *columns))
+
+        return multo_list._multo_new(result, shape=shape)
+
+    return expander
+
+
+def _axes(args, kwargs):
+    '''
+    Positions of the multo arguments, keys of the multo keyword arguments
+    and whether any of them is a multo_lazy.
+    '''
+    axes, lazy = _signature(tuple(map(type, args)))
+    keys = ()
+    if kwargs:
+        names = tuple(kwargs)
+        key_axes, lazy_kwargs = _signature(tuple(map(type, kwargs.values())))
+        keys = [names[i] for i in key_axes]
+        lazy = lazy or lazy_kwargs
+    return axes, keys, lazy
+
+
+def _broadcast(multos, mode, lazy):
+    '''
+    Values of the multos to expand, the resolved mode and the shape of the result
+    when nest results passed in join the index space with all their axes.
+    '''
+    if len(multos) > 1 and not mode:
+        mode = _resolve_mode(*multos)
+
+    # storage and shapes read through the slots, unless a multo_lazy has to be evaluated
+    values = None if lazy else list(map(_storage, multos))
+    shapes = [m.multo_shape for m in multos] if lazy else list(map(_shape, multos))
+
+    # nest results join with all their axes where that gives
+    # the same result as expanding their rows
+    shape = None
+    if any(shapes):
+        shapes = [s or (len(m),) for s, m in zip(shapes, multos)]
+        if len(multos) == 1 or mode == "zip" and len(set(shapes)) == 1:
+            shape = shapes[0]
+        elif mode == "nest":
+            shape = sum(reversed(shapes), ())
+        if not shape:
+            values = None
+
+    if values is None:
+        values = [m.multo_ravel().multo if shape else m.multo for m in multos]
+
+    return values, mode, shape
+
+
+def _nested(values):
+    # whether any item is a multo itself, to be expanded recursively
+    values = [v.values if type(v) is _categories else v for v in values]
+    return any(type(v) not in _NUMBERS and _signature(tuple(set(map(type, v))))[0] for v in values)
+
+
+def _columns(values, mode, shape=None):
+    '''
+    Iterators over the items of each of values in the order of the combined
+    index space, with the shape of the result.
+    '''
+    if len(values) == 1:
+        return values, shape
+
+    if mode == "zip":
+        if len(set(map(len, values))) > 1:
+            raise IndexError("Non-equal length of zipped multos")
+        return values, shape
+
+    if mode == "nest":
+        shape = shape or _nest_shape(values)
+    return _flat_columns(values), shape
+
+
+def _signature(types):
+    '''
+    Positions of the multo arguments in a tuple of argument types and whether
+    any of them is a multo_lazy, computed once per tuple of types.
+    '''
+    signature = _SIGNATURES.get(types)
+    if signature is None:
+        if len(_SIGNATURES) >= _SIGNATURES_MAX:
+            _SIGNATURES.clear()
+        axes = tuple(i for i, cls in enumerate(types) if issubclass(cls, multo_list))
+        signature = (axes, any(issubclass(types[i], multo_lazy) for i in axes)) if axes else _SCALAR
+        _SIGNATURES[types] = signature
+    return signature
+
+
+def _is_lazy(m):
+    # not isinstance(), which falls back to m.__class__, an attribute proxied to the items
+    return issubclass(type(m), multo_lazy)
+
+
+def _evaluate(m):
+    # a multo_lazy is evaluated into its storage and shape before they are read
+    if issubclass(type(m), multo_lazy):
+        m.multo
+
+
+def _bind(call, args, axes, kwargs, keys):
+    '''
+    Adapt call to take just the items of the multo arguments, at args positions axes
+    and kwargs keys, the other arguments staying fixed.
+    '''
+    if not kwargs:
+        return _binder(len(args), axes)(call, *[arg for i, arg in enumerate(args) if i not in axes])
+
+    n = len(axes)
+
+    def bound(*items):
+        argv = list(args)
+        for i, item in zip(axes, items):
+            argv[i] = item
+        kw = dict(kwargs)
+        for key, item in zip(keys, items[n:]):
+            kw[key] = item
+        return call(*argv, **kw)
+
+    return bound
+
+
+def _binder(n, axes):
+    '''
+    Factory of call adapters for n positional arguments with multos at positions
+    axes, compiled once per signature, e.g. for _binder(3, (0, 2)):
+
+        def bind(call, a1):
+            return lambda x0, x2: call(x0, a1, x2)
+    '''
+    binder = _BINDERS.get((n, axes))
+    if binder is None:
+        names = [f"x{i}" if i in axes else f"a{i}" for i in range(n)]
+        source = (f"def bind(call, {', '.join(f'a{i}' for i in range(n) if i not in axes)}):\n"
+                  f"    return lambda {', '.join(f'x{i}' for i in axes)}: call({', '.join(names)})\n")
+        namespace = {}
+        exec(source, namespace)
+        binder = _BINDERS[(n, axes)] = namespace["bind"]
+    return binder
+
+
+def _nest_shape(values):
+    '''
+    Shape of a nest result, which holds its values in flat mode ordering.
+    '''
+    return tuple(len(v) for v in reversed(values))
+
+
+def _operator_expander(op):
+    '''
+    Expander of an operator shared by all multos, built on first use.
+    '''
+    expander = _EXPANDERS.get(op)
+    if expander is None:
+        expander = _EXPANDERS[op] = _expander(op)
+    return expander
+
+
+def _common_type(values):
+    types = set(map(type, values))
+    if len(types) == 1:
+        return types.pop()
+
+
+def _type_proxy(cls, attr):
+    '''
+    Returns ("method", function) or ("attribute", getter) when attr is a plain
+    function or a property of cls, ("", None) when it has to be looked up per item.
+    Cached per (cls, attr) with the class attribute it was made of, made again
+    when that changes.
+    '''
+    value = _class_attribute(cls, attr)
+    key = (cls, attr)
+    cached = _PROXIES.get(key)
+    if cached is not None and cached[0] is value:
+        return cached[1]
+
+    proxy = ("", None)
+    if cls.__getattribute__ is object.__getattribute__:
+        if inspect.isfunction(value):
+            proxy = ("method", value)
+        elif isinstance(value, property) and value.fget is not None:
+            proxy = ("attribute", value.fget)
+
+    if len(_PROXIES) >= _PROXIES_MAX:
+        _PROXIES.clear()
+    _PROXIES[key] = (value, proxy)
+    return proxy
+
+
+def _class_attribute(cls, attr):
+    # attr as defined on the type of an instance, without calling descriptors
+    for base in cls.__mro__:
+        value = base.__dict__.get(attr)
+        if value is not None:
+            return value
+
+
+def _shadowed(values, attr):
+    # instance attributes take precedence over the functions of their type
+    try:
+        return any(map(operator.contains, map(_instance_dict, values), repeat(attr)))
+    except AttributeError:
+        # items with __slots__
+        return any(attr in getattr(item, "__dict__", ()) for item in values)
+
+
+def _call_method(function, m, *args, **kwargs):
+    '''
+    Call the plain function of a method for every item of m.
+    '''
+    if _THREADS is not None:
+        return multo_list(*_THREADS.map(lambda item: function(item, *args, **kwargs), m.multo))
+    if not args and not kwargs:
+        return multo_list(*map(function, m.multo))
+    return multo_list(*[function(item, *args, **kwargs) for item in m.multo])
+
+
+def _plan(args, kwargs, mode):
+    '''
+    Expand the arguments without calling anything: returns the list of
+    (args, kwargs) combinations, in the order of the result values, and the
+    result structure, which holds None in place of the values.
+    '''
+    combos = []
+    append = combos.append
+
+    def record(*args, **kwargs):
+        append((args, kwargs))
+
+    return combos, _expander(record, lazy=False)(*args, mode=mode, **kwargs)
+
+
+def _assemble(structure, results):
+    if isinstance(structure, multo_list):
+        return _fill(structure, iter(results))
+    return results[0]
+
+
+def _fill(structure, results):
+    values = _storage(structure)
+    if _signature(tuple(set(map(type, values))))[0]:
+        values = [_fill(item, results) if isinstance(item, multo_list) else next(results) for item in values]
+    else:
+        values = list(islice(results, len(values)))
+    return multo_list._multo_new(values, shape=_shape(structure))
+
+
+def _pool_expander(f, workers, executor, shared=None):
+
+    task = _pool_task(f)
+    compute = _pool_compute(f, workers, executor)
+
+    @wraps(f, updated=())
+    def expander(*args, mode=None, **kwargs):
+        combos, structure = _plan(args, kwargs, mode)
+
+        if not isinstance(structure, multo_list):
+            return f(*args, **kwargs)
+
+        if not shared:
+            return _assemble(structure, compute(combos))
+
+        starts, chunks = _pool_chunks(combos, workers)
+        block = _shared_block(create=True, size=max(len(combos), 1) * array(shared).itemsize)
+        try:
+            _pool_run(task.gather, [(block.name, shared, start, chunk) for start, chunk in zip(starts, chunks)], workers, executor)
+            results = block.buf.cast(shared)[:len(combos)]
+        finally:
+            block.unlink()
+            block.close()
+
+        if _nested([_storage(structure)]):
+            return _assemble(structure, results)
+        return multo_list._multo_new(results, shape=_shape(structure))
+
+    return expander
+
+
+def _pool_compute(f, workers, executor):
+    '''
+    Returns a function computing the results of a list of combinations in the pool.
+    '''
+    task = _pool_task(f)
+
+    def compute(combos):
+        if not combos:
+            return []
+        starts, chunks = _pool_chunks(combos, workers)
+        return list(chain.from_iterable(_pool_run(task, chunks, workers, executor)))
+
+    return compute
+
+
+def _pool_chunks(combos, workers):
+    # a few chunks per worker to even out the load
+    size = max(1, -(-len(combos) // (4 * (workers or os.cpu_count() or 1))))
+    starts = range(0, len(combos), size)
+    return starts, [combos[i:i + size] for i in starts]
+
+
+def _pool_run(fn, jobs, workers, executor):
+    if executor is not None:
+        return list(executor.map(fn, jobs))
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(fn, jobs))
+
+
+class _shared_block(shared_memory.SharedMemory):
+    '''
+    Shared memory block of a gathered result, mapped as long as multos view it.
+    '''
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            # exported to a result view: its mapping is closed with the last view,
+            # the rest (file descriptor) now
+            self._mmap = None
+            super().close()
+
+
+def _async_expander(f, concurrency):
+
+    @wraps(f, updated=())
+    async def expander(*args, mode=None, **kwargs):
+        combos, structure = _plan(args, kwargs, mode)
+
+        if not isinstance(structure, multo_list):
+            return await f(*args, **kwargs)
+
+        if concurrency is None:
+            results = await asyncio.gather(*(f(*args, **kwargs) for args, kwargs in combos))
+
+        else:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(combo):
+                args, kwargs = combo
+                async with semaphore:
+                    return await f(*args, **kwargs)
+
+            results = await asyncio.gather(*map(bounded, combos))
+
+        return _assemble(structure, results)
+
+    return expander
+
+
+def _batch_expander(f, size):
+
+    @wraps(f, updated=())
+    def expander(*args, mode=None, **kwargs):
+        columns, keywords, n, finish = _batch_columns(args, kwargs, mode)
+
+        results = []
+        step = size or max(n, 1)
+        for start in range(0, n, step):
+            count = min(step, n - start)
+            batch = f(*[list(islice(column, count)) for column in columns],
+                      **{key: list(islice(column, count)) for key, column in keywords.items()})
+            if len(batch) != count:
+                raise ValueError(f"{f.__name__} returned {len(batch)} results for a batch of {count}")
+            results.extend(batch)
+
+        return finish(results)
+
+    return expander
+
 
+def _batch_columns(args, kwargs, mode):
+    '''
+    Iterators over the positional and keyword arguments of all the expanded
+    combinations, their number, and the function building the result from
+    the list of results.
+    '''
+    axes, keys, lazy = _axes(args, kwargs)
+    multos = [args[i] for i in axes] + [kwargs[key] for key in keys]
+
+    if multos:
+        values, mode, shape = _broadcast(multos, mode, lazy)
+
+        if not _nested(values):
+            items, shape = _columns(values, mode, shape)
+            n = len(values[0]) if len(values) == 1 or mode == "zip" else math.prod(map(len, values))
+            columns = [repeat(arg) for arg in args]
+            keywords = {key: repeat(arg) for key, arg in kwargs.items()}
+            for i, column in zip(axes, items):
+                columns[i] = iter(column)
+            for key, column in zip(keys, items[len(axes):]):
+                keywords[key] = iter(column)
+            return columns, keywords, n, partial(multo_list._multo_new, shape=shape)
+
+    # scalar calls and multos of multos follow the generic plan
+    combos, structure = _plan(args, kwargs, mode)
+    columns = [iter(column) for column in zip(*(args for args, kwargs in combos))]
+    keywords = {key: iter([kwargs[key] for args, kwargs in combos]) for key in kwargs}
+    return columns, keywords, len(combos), partial(_assemble, structure)
+
+
+class _pool_task:
+    '''
+    Calls f for a chunk of argument combinations in a pool worker.
+    Pickled as a reference to f, looked up behind its @multo wrapper.
+    '''
 
-def multo_len(m):
-    return len(m.multo)
+    def __init__(self, f):
+        self.f = f
 
+    def __call__(self, combos):
+        return [self.f(*args, **kwargs) for args, kwargs in combos]
 
-def inner_len(m):
-    return m.multo_inner_len()
+    def gather(self, job):
+        '''
+        Write the results of a chunk as typecode values into the named
+        shared memory block, from the position of its first combination.
+        '''
+        name, typecode, start, combos = job
+        block = shared_memory.SharedMemory(name)
+        try:
+            # released before the block is closed, also when the results do not fit typecode
+            with block.buf.cast(typecode) as view:
+                view[start:start + len(combos)] = array(typecode, self(combos))
+        finally:
+            block.close()
 
-def inner_bool(m):
-    return m.multo_inner_bool()
+    def __reduce__(self):
+        return _pool_task_lookup, (self.f.__module__, self.f.__qualname__)
 
-def inner_int(m):
-    return m.multo_inner_int()
 
-def inner_bytes(m):
-    return m.multo_inner_bytes()
+def _pool_task_lookup(module, qualname):
+    f = importlib.import_module(module)
+    for name in qualname.split("."):
+        f = getattr(f, name)
+    return _pool_task(inspect.unwrap(f))
 
-def inner_complex(m):
-    return m.multo_inner_complex()
 
+def _lazy(m):
+    if _is_lazy(m):
+        return m
+    return multo_lazy(multo=m.multo, mode=m.multo_mode)
 
-def multo(*args, **kwargs):
 
-    if len(args) == 1 and _is_method(args[0]):
-        assert not kwargs
-        mode = args[0]
-        return multo_decor(mode)
+def _defer(f, args, axes, kwargs, keys, multos, mode):
+    '''
+    multo_lazy calling f with the items of the multos at args positions axes
+    and kwargs keys, None when it is not deferred: nest mode over more than two.
+    '''
+    call = f if len(axes) == len(args) and not kwargs else _bind(f, args, axes, kwargs, keys)
+    if len(multos) == 1:
+        return _lazy(multos[0])._multo_list__unary(call)
+    if len(multos) == 2:
+        return _lazy_apply(call, *multos, mode)
+    mode = mode or _resolve_mode(*multos)
+    if mode == "nest":
+        return None
+    return multo_lazy._multo_combine(multos, call, mode)
 
-    elif not args and "mode" in kwargs:
-        mode = kwargs.pop("mode", None)
-        assert not kwargs
-        return multo_decor(mode)
 
-    else:
-        return multo_list(*args, **kwargs)
+def _lazy_apply(f, a, b, mode):
+    if isinstance(a, multo_list):
+        return _lazy(a)._multo_apply(b, f, mode)
+    return b._multo_apply(a, lambda bb, aa: f(aa, bb), mode)
 
 
-def multo_decor(*args, mode=None):
+class _sequence_view(Sequence):
+    '''
+    Window over a list or another sequence by a range of its indexes,
+    reading and writing the items of the underlying sequence.
     '''
-    Usage:
 
-    @multo_decor
-    def abc():
-        ...
+    __slots__ = ("base", "indexes")
 
-    @multo_decor('zip')
-    def abc():
-        ...
+    def __init__(self, base, indexes):
+        self.base = base
+        self.indexes = indexes
 
-    @multo_decor(mode='zip')
-    def abc():
-        ...
+    def __len__(self):
+        return len(self.indexes)
 
-    @multo
-    def abc():
-        ...
+    def __iter__(self):
+        return map(self.base.__getitem__, self.indexes)
 
-    @multo(mode='zip')
-    def abc():
-        ...
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _sequence_view(self.base, self.indexes[index])
+        return self.base[self.indexes[index]]
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            self.base[self.indexes[index]] = value
+            return
+        indexes = self.indexes[index]
+        value = list(value)
+        if len(value) != len(indexes):
+            raise ValueError("Cannot resize a multo view")
+        if indexes.step == 1 and type(self.base) is list:
+            self.base[indexes.start:indexes.start + len(indexes)] = value
+        else:
+            for i, item in zip(indexes, value):
+                self.base[i] = item
+
+
+class _categories(Sequence):
+    '''
+    Dictionary-encoded storage: the distinct values, and for every position
+    the code of its value, its index among them.
     '''
 
-    if len(args) == 1 and callable(args[0]):
-        f = args[0]
+    __slots__ = ("values", "codes")
 
-    elif len(args) == 0:
-        # called as @multo_decor() maybe with mode kw
-        return partial(multo_decor, mode=mode)
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
 
-    elif len(args) == 1:
-        # called as @multo_decor(mode)
-        mode = args[0]
-        return partial(multo_decor, mode=mode)
+    def __len__(self):
+        return len(self.codes)
 
-    else:
-        raise ValueError("Invalid multo_decor arguments")
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
 
-    if mode is not None:
-        mode = mode[:4]
-        if mode.startswith("zip"):
-            mode = "zip"
-        assert mode in ("flat", "nest", "zip")
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _categories(self.values, self.codes[index])
+        return self.values[self.codes[index]]
 
-    @wraps(f, updated=())
-    def expander(*args, mode=None):
-
-        if len(args) == 1:
-            a = args[0]
-            if isinstance(a, multo_list):
-                return multo_list(multo=[expander(aa) for aa in a.multo])
-            return f(a)
-
-        # for setitem() there is an additional 3rd value item, must be passed around
-        a, b, *c = args
-
-        if isinstance(b, multo_list) and isinstance(a, multo_list):
-
-            if not mode:
-                if a.multo_mode is None and b.multo_mode is None:
-                    mode = DEFAULT_MODE
-                elif a.multo_mode is None:
-                    mode = b.multo_mode
-                elif b.multo_mode is None:
-                    mode = a.multo_mode
-                elif a.multo_mode == b.multo_mode:
-                    mode = a.multo_mode
-                else:
-                    raise AttributeError(f"Incompatible multo types {a.multo_mode} and {b.multo_mode}")
-
-            if   mode == "flat":
-                return multo_list(multo=[expander(aa, bb, *c, mode=mode) for bb in b.multo for aa in a.multo])
-
-            elif mode == "nest":
-                pass
 
-            elif mode == "zip":
-                if multo_len(a) != multo_len(b):
-                    raise IndexError("Non-equal length of zipped multos")
-                return multo_list(multo=[expander(aa, bb, *c, mode=mode) for aa, bb in zip(a.multo, b.multo)])
+def _code_typecode(n):
+    # smallest unsigned array typecode for codes below n
+    return "B" if n <= 1 << 8 else "H" if n <= 1 << 16 else "I" if n <= 1 << 32 else "Q"
 
-        if isinstance(b, multo_list):
-            return multo_list(multo=[expander(a, bb, *c, mode=mode) for bb in b.multo])
 
-        if isinstance(a, multo_list):
-            return multo_list(multo=[expander(aa, b, *c, mode=mode) for aa in a.multo])
+def _recode(m, codes):
+    return multo_list._multo_new(_categories(_storage(m), codes))
 
-        return f(a, b, *c)
 
-    if len(args) == 1 and callable(args[0]):
-        # called as @multo_decor
-        return partial(expander, mode=mode)
+def _window(values, index):
+    '''
+    Slice of a storage sharing its items: memoryviews over arrays,
+    _sequence_view over lists and other sequences.
+    '''
+    if type(values) is array:
+        return memoryview(values)[index]
+    if type(values) in (memoryview, range, _sequence_view):
+        return values[index]
+    return _sequence_view(values, range(len(values))[index])
+
+
+class _outer_view:
+    '''
+    Indexing a multo as a whole, see multo_list.multo_view.
+    '''
+
+    __slots__ = ("m",)
+
+    def __init__(self, m):
+        _evaluate(m)
+        self.m = m
+
+    def __len__(self):
+        return len(self.m)
+
+    def __getitem__(self, index):
+        m = self.m
+        values, shape, mode = _storage(m), _shape(m), _mode(m)
+
+        if shape is None:
+            if isinstance(index, slice):
+                return multo_list._multo_new(_window(values, index), mode)
+            return values[index]
+
+        # rows of a nest result, contiguous in its storage
+        size = math.prod(shape[1:])
+        if not isinstance(index, slice):
+            row = range(shape[0])[index] * size
+            return multo_list._multo_new(_window(values, slice(row, row + size)), mode, shape[1:])
+
+        rows = range(shape[0])[index]
+        if rows.step == 1 or len(rows) < 2:
+            window = _window(values, slice(rows.start * size, (rows.start + len(rows)) * size))
+        else:
+            # strided rows are copied
+            window = list(chain.from_iterable(values[row * size:(row + 1) * size] for row in rows))
+        return multo_list._multo_new(window, mode, (len(rows),) + shape[1:])
+
+
+def _dump_typecode(values):
+    '''
+    Array typecode inferred for a chunk of multo_dump values: 'q' for ints,
+    'd' for floats or ints mixed with floats.
+    '''
+    types = set(map(type, values))
+    if types <= {int}:
+        return "q"
+    if types <= {int, float}:
+        return "d"
+    raise TypeError(f"Cannot dump {', '.join(sorted(t.__name__ for t in types - {int, float}))} values without a typecode")
+
+
+def _widen(f, size):
+    '''
+    Rewrite the 'q' values written to f so far as 'd' values of the same
+    size, in place, size values at a time.
+    '''
+    end = f.tell()
+    step = size * 8
+    for start in range(0, end, step):
+        f.seek(start)
+        chunk = array("q")
+        chunk.frombytes(f.read(min(step, end - start)))
+        f.seek(start)
+        array("d", chunk).tofile(f)
+    f.seek(end)
+
+
+def _unpickle(values, mode, shape, typecode=None):
+    if typecode is not None:
+        # raw buffer of a numeric storage
+        values = memoryview(values).cast("B").cast(typecode)
+    return multo_list._multo_new(values, mode, shape)
 
 
 def _is_method(elem):
@@ -164,16 +1559,30 @@ def _is_method(elem):
 
 class multo_list:
 
-    __SUPER_METHODS = ("multo", "multo_mode")
+    # nest results keep all their values in one flat __multo, row-major by __shape
+    __slots__ = ("__multo", "__mode", "__shape", "__weakref__")
 
     @property
     def multo(self):
-        return self.__multo
+        '''
+        Items of the multo. For a nest result these are row multos built
+        on every access from copies of its values, so writes to them do not
+        reach the result: use multo_view[i] for a row sharing its storage
+        and multo_ravel() for all the values.
+        '''
+        if self.__shape is None:
+            return self.__multo
+        return self.__rows()
 
     @multo.setter
     def multo(self, value):
-        assert isinstance(value, list)
+        # sequences and buffers (array, range, memoryview, mmap, numpy arrays, ...) are kept without copying
+        if not isinstance(value, (list, array, memoryview, Sequence)):
+            value = memoryview(value)
+        assert not isinstance(value, str)
+        assert type(value) is not memoryview or value.ndim == 1
         self.__multo = value
+        self.__shape = None
 
     @property
     def multo_mode(self):
@@ -188,6 +1597,8 @@ class multo_list:
 
     def __init__(self, *args, **kwargs):
 
+        self.__shape = None
+
         if "multo" in kwargs:
             self.multo = kwargs.pop("multo")
 
@@ -197,17 +1608,164 @@ class multo_list:
         self.multo_mode = kwargs.pop("mode", None)
         assert not kwargs
 
-        self.__decor = multo_decor(mode=self.multo_mode)
+    @staticmethod
+    def _multo_new(values, mode=None, shape=None):
+        '''
+        Construct a multo from a list or array produced by the library itself,
+        skipping __init__ and the validation of the multo setter.
+        '''
+        self = object.__new__(multo_list)
+        self.__multo = values
+        self.__mode = mode
+        self.__shape = shape if shape is not None and len(shape) > 1 else None
+        return self
+
+    def __rows(self):
+        values, (n, *shape) = self.__multo, self.__shape
+        size = math.prod(shape)
+        return [multo_list._multo_new(values[i * size:(i + 1) * size], shape=shape) for i in range(n)]
+
+    @property
+    def multo_shape(self):
+        '''
+        Shape of a nest result (outermost first), (len,) for other multos.
+        '''
+        _evaluate(self)
+        if self.__shape is None:
+            return (len(self.__multo),)
+        return self.__shape
+
+    def multo_ravel(self):
+        '''
+        Flat multo of all the values of a nest result, sharing its storage.
+        '''
+        _evaluate(self)
+        return multo_list._multo_new(self.__multo, self.__mode)
+
+    def multo_reshape(self, *shape):
+        '''
+        Multo sharing the storage of this one with a new shape, one of the
+        dimensions can be -1 to be computed from the length.
+        '''
+        _evaluate(self)
+        size = len(self.__multo)
+        if -1 in shape:
+            known = -math.prod(shape)
+            shape = tuple(size // known if n == -1 else n for n in shape)
+        if math.prod(shape) != size:
+            raise ValueError(f"Cannot reshape {size} values to {shape}")
+        return multo_list._multo_new(self.__multo, self.__mode, shape)
+
+    @property
+    def multo_view(self):
+        '''
+        Outer indexing, which the multo itself broadcasts to its items:
+        m.multo_view[i] is the item (row of a nest result) at i,
+        m.multo_view[a:b] a multo sharing the storage of m.
+        '''
+        return _outer_view(self)
+
+    def multo_take(self, index, axis=0):
+        '''
+        Values at index along axis of a nest result, with the remaining shape.
+        '''
+        shape = self.multo_shape
+        if not -shape[axis] <= index < shape[axis]:
+            raise IndexError("multo index out of range")
+
+        values = self.__multo
+        stride = math.prod(shape[axis + 1:])
+        block = stride * shape[axis]
+        start = index % shape[axis] * stride
+
+        taken = values[:0] if type(values) in (list, array) else []
+        # block is 0 for no values at all
+        for offset in range(start, len(values), block or 1):
+            taken += values[offset:offset + stride]
+
+        return multo_list._multo_new(taken, self.__mode, shape[:axis] + shape[axis + 1:])
 
     def __getattribute__(self, attr):
 
-        if not attr.startswith("_multo_list__") and not attr.startswith("multo_inner_") and not attr in self.__SUPER_METHODS:
+        # "multo", "multo_mode", "multo_inner_len", "_multo_list__multo", ... and the pickle and copy hooks
+        if not attr.startswith(("multo", "_multo_")) and attr not in ("__reduce_ex__", "__copy__", "__deepcopy__"):
             raise AttributeError(f"Attribute {attr} not recognized")
 
-        return super().__getattribute__(attr)
+        return object.__getattribute__(self, attr)
+
+    def __reduce_ex__(self, protocol):
+        '''
+        Pickle the storage with the mode and shape. With protocol 5 numeric buffers
+        are pickled as PickleBuffer, out-of-band when a buffer_callback is given,
+        and unpickled as a memoryview over the received buffer.
+        '''
+        _evaluate(self)
+
+        values, mode, shape = self.__multo, self.__mode, self.__shape
+
+        if protocol >= 5 and type(values) in (array, memoryview) and memoryview(values).contiguous:
+            return _unpickle, (pickle.PickleBuffer(values), mode, shape, memoryview(values).format)
+
+        # copied, so that copy.copy() does not share the storage
+        if type(values) in (list, array):
+            values = values[:]
+        elif type(values) not in (range, tuple, bytes, _categories):
+            values = _pack(list(values))
+
+        return _unpickle, (values, mode, shape)
+
+    def __copy__(self):
+        # a new multo over a copy of the storage
+        unpickle, args = self.__reduce_ex__(4)
+        return unpickle(*args)
+
+    def __deepcopy__(self, memo):
+        unpickle, args = self.__reduce_ex__(4)
+        return unpickle(*copy.deepcopy(args, memo))
 
     def __getattr__(self, attr):
 
+        shape = self.__shape
+        if shape is not None:
+            value = getattr(self.multo_ravel(), attr)
+            if isinstance(value, multo_list):
+                return value.multo_reshape(*shape)
+
+            @wraps(value)
+            def mulmethod(*args, **kwargs):
+                return value(*args, **kwargs).multo_reshape(*shape)
+
+            return mulmethod
+
+        values = self.multo
+        if type(values) is _categories:
+            # once per distinct value, remapped through the codes
+            value = getattr(multo_list._multo_new(values.values), attr)
+            if isinstance(value, multo_list):
+                return _recode(value, values.codes)
+
+            @wraps(value)
+            def mulmethod(*args, **kwargs):
+                return _recode(value(*args, **kwargs), values.codes)
+
+            return mulmethod
+
+        # items of the same type: look the attribute up once on the type
+        # (like the generic path below, assuming the first item is representative)
+        cls = _common_type(values)
+        if cls is not None:
+            kind, function = _type_proxy(cls, attr)
+            if kind == "method" and not _shadowed(values, attr):
+
+                @wraps(function)
+                def mulmethod(*args, **kwargs):
+                    return _call_method(function, self, *args, **kwargs)
+
+                return mulmethod
+
+            if kind == "attribute":
+                return multo_list(*map(function, self.multo))
+
         itattr = None
 
         for item in self.multo:
@@ -218,6 +1776,8 @@ class multo_list:
 
             @wraps(itattr)
             def mulmethod(*args, **kwargs):
+                if _THREADS is not None:
+                    return multo_list(*_THREADS.map(lambda item: getattr(item, attr)(*args, **kwargs), self.multo))
                 return multo_list(*tuple(getattr(item, attr)(*args, **kwargs) for item in self.multo))
 
             return mulmethod
@@ -227,6 +1787,8 @@ class multo_list:
     def __eq__(self, other):
         if not isinstance(other, multo_list):
             return False
+        if self.__shape is not None and self.__shape == other.multo_shape:
+            return self.multo_ravel() == other.multo_ravel()
         return all(a == b for a, b in zip_equal(self.multo, other.multo))
 
     def __str__(self):
@@ -241,14 +1803,17 @@ class multo_list:
         but len() must return an integer.
         Returns multo len.
         '''
+        if self.__shape is not None:
+            return self.__shape[0]
         return len(self.multo)
 
     def __bool__(self):
-        an = any(self.multo)
-        al = all(self.multo)
+        values = map(bool, self.multo)
+        first = next(values, None)
 
-        if an == al:
-            return an
+        # single pass, stops at the first differing value
+        if first is not None and all(map(first.__eq__, values)):
+            return first
 
         raise(ValueError("Conversion to bool failed: not all multo values evaluate to the same bool"))
 
@@ -270,7 +1835,18 @@ class multo_list:
         raise(ValueError("Conversion to index failed: not all multo values evaluate to the same index"))
 
     def __unary_proxy(self, op):
-        return self.__decor(op)(self)
+        if _STATS is not None:
+            return _STATS._measure(op.__name__, (self,), None, partial(self.__unary, op))
+        return self.__unary(op)
+
+    def __unary(self, op):
+        if self.__shape is not None:
+            return self.multo_ravel().__unary(op).multo_reshape(*self.__shape)
+        if type(self.multo) in _NUMBERS:
+            return _numeric_unary(self, op)
+        if _THREADS is not None:
+            return multo_list._multo_new(list(_THREADS.map(_operator_expander(op), self.multo)))
+        return _operator_expander(op)(self)
 
     def __neg__(self):
         return self.__unary_proxy(operator.neg)
@@ -299,88 +1875,295 @@ class multo_list:
     def multo_inner_complex(self):
         return self.__unary_proxy(complex)
 
+    def __reduction(self, fn, axis):
+        '''
+        Apply fn, reducing a sequence of values to one, to all the values
+        (axis None) or along an axis of a nest result.
+        '''
+        _evaluate(self)
+
+        values = self.__multo if self.__shape is not None else self.multo
+
+        if axis is None:
+            return fn(values)
+
+        shape = self.multo_shape
+        axis %= len(shape)
+        if len(shape) == 1:
+            return fn(values)
+
+        stride = math.prod(shape[axis + 1:])
+        block = stride * shape[axis]
+        # one result per position outside the axis, an empty axis reduces empty slices
+        outer = math.prod(shape[:axis])
+        results = [fn(values[o * block + i:(o + 1) * block:stride]) for o in range(outer) for i in range(stride)]
+        return multo_list._multo_new(results, shape=shape[:axis] + shape[axis + 1:])
+
+    def multo_sum(self, axis=None):
+        return self.__reduction(sum, axis)
+
+    def multo_min(self, axis=None):
+        return self.__reduction(min, axis)
+
+    def multo_max(self, axis=None):
+        return self.__reduction(max, axis)
+
+    def multo_mean(self, axis=None):
+        return self.__reduction(_mean, axis)
+
+    def multo_any(self, axis=None):
+        return self.__reduction(any, axis)
+
+    def multo_all(self, axis=None):
+        return self.__reduction(all, axis)
+
+    def multo_reduce(self, op, *initial, axis=None):
+        '''
+        functools.reduce of the values with op, optionally along an axis of a nest result.
+        '''
+        return self.__reduction(lambda values: reduce(op, values, *initial), axis)
+
+    def multo_freeze(self):
+        '''
+        Immutable, hashable copy of this multo, see multo_frozen.
+        '''
+        return multo_frozen._multo_from(self)
+
+    def multo_unique(self):
+        '''
+        Distinct values in order of first appearance, and the multo of the index
+        of each value among them, with the mode and shape of this one.
+        Multo items are compared frozen.
+        '''
+        _evaluate(self)
+
+        values = self.__multo
+        if type(values) not in _NUMBERS and _signature(tuple(set(map(type, values))))[0]:
+            values = [item.multo_freeze() if isinstance(item, multo_list) else item for item in values]
+
+        positions = dict(zip(dict.fromkeys(values), range(len(values))))
+        inverse = list(map(positions.__getitem__, values))
+        return multo_list._multo_new(list(positions), self.__mode), multo_list._multo_new(inverse, self.__mode, self.__shape)
+
+    def multo_encode(self):
+        '''
+        Dictionary-encoded multo with the mode and shape of this one: it stores
+        the distinct values and a compact array of codes, and evaluates unary
+        operators, attributes and functions applied to it once per distinct value.
+        '''
+        uniques, inverse = self.multo_unique()
+        codes = array(_code_typecode(len(uniques.multo)), inverse.multo_ravel().multo)
+        return multo_list._multo_new(_categories(uniques.multo, codes), self.__mode, self.__shape)
+
+    def multo_decode(self):
+        '''
+        Multo storing all its values, of a dictionary-encoded one.
+        '''
+        _evaluate(self)
+
+        values = self.__multo
+        if type(values) is _categories:
+            values = list(values)
+        return multo_list._multo_new(values, self.__mode, self.__shape)
+
+    def multo_iter(self):
+        '''
+        Iterate over the multo values.
+        '''
+        return iter(self.multo)
+
+    def multo_chunks(self, size):
+        '''
+        Iterate over the multo values in multos of at most size values.
+        '''
+        values = self.multo_iter()
+        while True:
+            chunk = list(islice(values, size))
+            if not chunk:
+                return
+            yield multo_list._multo_new(chunk)
+
+    def multo_dump(self, path, typecode=None, size=1 << 16, writable=False):
+        '''
+        Write the values to a file as raw typecode values (by default ints, or
+        floats if any value is a float; other types, ints out of the 'q' range
+        and bools need an explicit typecode) in chunks of size, and return the
+        memory-mapped multo of the file, with the mode and shape of this one.
+        The values of a multo_lazy are computed chunk by chunk, never held in
+        memory all at once. The file is replaced only once all are written.
+        '''
+        values, shape = self._multo_stream()
+        inferred = typecode is None
+
+        directory, name = os.path.split(os.path.abspath(path))
+        temp = os.path.join(directory, f".{name}.{os.urandom(4).hex()}")
+        try:
+            with open(temp, "x+b") as f:
+                while True:
+                    chunk = list(islice(values, size))
+                    if not chunk:
+                        break
+                    if inferred:
+                        code = _dump_typecode(chunk)
+                        if typecode == "q" and code == "d":
+                            _widen(f, size)
+                        if typecode != "d":
+                            typecode = code
+                    array(typecode, chunk).tofile(f)
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+
+        m = multo_open(path, typecode or "d", writable, self.__mode)
+        return m.multo_reshape(*shape) if shape else m
+
+    def _multo_stream(self):
+        '''
+        Iterator over the values in flat order and the shape they have, None if flat.
+        '''
+        return iter(self.__multo), self.__shape
+
     #'unary': ('__del__', '__delete__', '__float__', '__hash__', '__hex__', '__int__', '__oct__', '__nonzero__', '__reversed__', '__str__', '__unicode__'),
 
     def __binary_proxy(self, other, op):
-        return self.__decor(op)(self, other)
+        if _STATS is not None:
+            return _STATS._measure(op.__name__, (self, other), self.multo_mode, partial(self.__binary, other, op))
+        return self.__binary(other, op)
+
+    def __binary(self, other, op):
+        shape = self.__shape
+        if shape is not None:
+            if not isinstance(other, multo_list):
+                return self.multo_ravel().__binary(other, op).multo_reshape(*shape)
+            if other.multo_shape == shape and (self.multo_mode or _resolve_mode(self, other)) == "zip":
+                flat = self.multo_ravel()
+                flat.multo_mode = "zip"
+                return flat.__binary(other.multo_ravel(), op).multo_reshape(*shape)
+
+        if _is_lazy(other) and not _is_lazy(self):
+            return _lazy(self).__binary(other, op)
+        if type(self.multo) in _NUMBERS:
+            result = _numeric_binary(self, other, op)
+            if result is not None:
+                return result
+        return _operator_expander(op)(self, other, mode=self.multo_mode)
+
+    def __inplace_proxy(self, other, op):
+        if _STATS is not None:
+            return _STATS._measure(op.__name__, (self, other), self.multo_mode, partial(self.__inplace, other, op))
+        return self.__inplace(other, op)
+
+    def __inplace(self, other, op):
+        '''
+        Augmented assignment updating the storage of this multo when every value
+        is combined with a single item: a scalar, or a multo zipped with the same shape.
+        Anything else builds a new multo like the binary operator.
+        '''
+        if _is_lazy(self):
+            return self.__binary(other, op)
+
+        if isinstance(other, multo_list):
+            if (_is_lazy(other) or other.multo_shape != self.multo_shape
+                    or (self.__mode or _resolve_mode(self, other)) != "zip"):
+                return self.__binary(other, op)
+            items = _storage(other)
+        else:
+            items = repeat(other)
+
+        values = self.__multo
+
+        # views write through to their base, unless it is immutable: tuples, encoded or frozen storage
+        if type(values) is list or type(values) is _sequence_view and isinstance(values.base, MutableSequence):
+            values[:] = map(op, values, items)
+            return self
+
+        result = list(map(op, values, items))
+        try:
+            values[:] = array(values.typecode if type(values) is array else values.format, result)
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            # immutable or read-only storage, or values no longer fitting its typecode, e.g. int /= int
+            return multo_list._multo_new(result, self.__mode, self.__shape)
+        return self
 
     def __add__(self, other):
         return self.__binary_proxy(other, operator.add)
 
     def __radd__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y+x)
+        return self.__binary_proxy(other, _radd)
 
     def __sub__(self, other):
         return self.__binary_proxy(other, operator.sub)
 
     def __rsub__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y-x)
+        return self.__binary_proxy(other, _rsub)
 
     def __mul__(self, other):
         return self.__binary_proxy(other, operator.mul)
 
     def __rmul__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y*x)
+        return self.__binary_proxy(other, _rmul)
 
     def __truediv__(self, other):
         return self.__binary_proxy(other, operator.truediv)
     
     def __rtruediv__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y/x)
+        return self.__binary_proxy(other, _rtruediv)
 
     def __floordiv__(self, other):
         return self.__binary_proxy(other, operator.floordiv)
     
     def __rfloordiv__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y//x)
+        return self.__binary_proxy(other, _rfloordiv)
 
     def __mod__(self, other):
         return self.__binary_proxy(other, operator.mod)
 
     def __rmod__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y%x)
+        return self.__binary_proxy(other, _rmod)
 
     def __divmod__(self, other):
-        return self.__binary_proxy(other, lambda x, y: divmod(x, y))
+        return self.__binary_proxy(other, divmod)
 
     def __rdivmod__(self, other):
-        return self.__binary_proxy(other, lambda x, y: divmod(y, x))
+        return self.__binary_proxy(other, _rdivmod)
 
     def __pow__(self, other):
         return self.__binary_proxy(other, operator.pow)
 
     def __rpow__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y**x)
+        return self.__binary_proxy(other, _rpow)
 
     def __and__(self, other):
         return self.__binary_proxy(other, operator.and_)
 
     def __rand__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y&x)
+        return self.__binary_proxy(other, _rand)
 
     def __or__(self, other):
         return self.__binary_proxy(other, operator.or_)
 
     def __ror__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y|x)
+        return self.__binary_proxy(other, _ror)
 
     def __xor__(self, other):
         return self.__binary_proxy(other, operator.xor)
 
     def __rxor__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y^x)
+        return self.__binary_proxy(other, _rxor)
 
     def __lshift__(self, other):
         return self.__binary_proxy(other, operator.lshift)
 
     def __rlshift__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y<<x)
+        return self.__binary_proxy(other, _rlshift)
 
     def __rshift__(self, other):
         return self.__binary_proxy(other, operator.rshift)
 
     def __rrshift__(self, other):
-        return self.__binary_proxy(other, lambda x, y: y>>x)
+        return self.__binary_proxy(other, _rrshift)
 
     def __lt__(self, other):
         return self.__binary_proxy(other, operator.lt)
@@ -409,7 +2192,12 @@ class multo_list:
         return self.__binary_proxy(other, operator.getitem)
 
     def __ternary_proxy(self, other, op, value):
-        return self.__decor(op)(self, other, value)
+        if _STATS is not None:
+            return _STATS._measure(op.__name__, (self, other, value), self.multo_mode, partial(self.__ternary, other, op, value))
+        return self.__ternary(other, op, value)
+
+    def __ternary(self, other, op, value):
+        return _operator_expander(op)(self, other, value, mode=self.multo_mode)
 
     def __setitem__(self, index, value):
         return self.__ternary_proxy(index, operator.setitem, value)
@@ -427,49 +2215,307 @@ class multo_list:
         return self.__binary_proxy(other, operator.setslice)
 
     def __iadd__(self, other):
-        return self.__binary_proxy(other, operator.iadd)
+        return self.__inplace_proxy(other, operator.iadd)
 
     def __isub__(self, other):
-        return self.__binary_proxy(other, operator.isub)
+        return self.__inplace_proxy(other, operator.isub)
 
     def __imul__(self, other):
-        return self.__binary_proxy(other, operator.imul)
+        return self.__inplace_proxy(other, operator.imul)
 
     def __itruediv__(self, other):
-        return self.__binary_proxy(other, operator.itruediv)
+        return self.__inplace_proxy(other, operator.itruediv)
 
     def __ifloordiv__(self, other):
-        return self.__binary_proxy(other, operator.ifloordiv)
+        return self.__inplace_proxy(other, operator.ifloordiv)
 
     def __ilshift__(self, other):
-        return self.__binary_proxy(other, operator.ilshift)
+        return self.__inplace_proxy(other, operator.ilshift)
 
     def __imod__(self, other):
-        return self.__binary_proxy(other, operator.imod)
+        return self.__inplace_proxy(other, operator.imod)
 
     def __iand__(self, other):
-        return self.__binary_proxy(other, operator.iand)
+        return self.__inplace_proxy(other, operator.iand)
 
     def __ior__(self, other):
-        return self.__binary_proxy(other, operator.ior)
+        return self.__inplace_proxy(other, operator.ior)
 
     def __ipow__(self, other):
-        return self.__binary_proxy(other, operator.ipow)
+        return self.__inplace_proxy(other, operator.ipow)
 
     def __irshift__(self, other):
-        return self.__binary_proxy(other, operator.irshift)
+        return self.__inplace_proxy(other, operator.irshift)
 
     def __ixor__(self, other):
-       return self.__binary_proxy(other, operator.ixor)
-
-    def x__hash__(self):
-        #TODO
-        raise
+       return self.__inplace_proxy(other, operator.ixor)
 
     def x__format__(self, format_spec):
         #TODO
         raise
 
+# slot readers bypassing the attribute check of multo_list.__getattribute__,
+# _shape is None but for nest results, whose _storage holds their values in flat order
+_storage = multo_list._multo_list__multo.__get__
+_shape = multo_list._multo_list__shape.__get__
+_mode = multo_list._multo_list__mode.__get__
+
+
+class multo_lazy(multo_list):
+    '''
+    Multo recording operators as an expression instead of applying them.
+
+    Chained unary, scalar and zip operators are fused into a pipeline of map()
+    iterators over the source elements, which is evaluated in a single pass
+    when the value is first needed (multo, str, ==, len, attribute access, ...),
+    so no intermediate multos are built:
+
+        m = multo_lazy(1, 2, 3)
+        r = (m * 2 + 1) ** 2 - k    # nothing computed yet
+        print(r)                    # one pass over m, one over the m x k combinations
+
+    Operands of flat and nest products, and operands combined in a different
+    mode, are evaluated first as sources of the expression, at their own size.
+
+    Functions decorated with @multo applied to a multo_lazy return a multo_lazy
+    too, with any number of multo arguments, positional or keyword, but in nest
+    mode over more than two multos, which is evaluated at once. Its values can
+    be streamed with multo_iter() or multo_chunks(size) without ever holding
+    the whole flat product in memory.
+    '''
+
+    __slots__ = ("__sources", "__fn", "__combine", "__depth")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # sources is None once the value is materialized
+        self.__sources = None
+        self.__fn = None
+        self.__combine = None
+        self.__depth = 0
+
+    @property
+    def multo(self):
+        if self.__sources is not None:
+            self.__force()
+        return multo_list.multo.fget(self)
+
+    @multo.setter
+    def multo(self, value):
+        multo_list.multo.fset(self, value)
+
+    @classmethod
+    def __node(cls, sources, fn, combine, depth=1):
+        node = cls()
+        node.__sources = sources
+        node.__fn = fn
+        node.__combine = combine
+        node.__depth = depth
+        if depth > _FUSE_DEPTH:
+            # long chains are evaluated into a source, within the recursion limit
+            node.__force()
+        return node
+
+    def __fused_depth(self):
+        return self.__depth if self.__fn is not None else 0
+
+    def __expression(self):
+        if self.__sources is None:
+            return [self], None, None
+        return self.__sources, self.__fn, self.__combine
+
+    def __evaluate(self):
+        values = [source.multo for source in self.__sources]
+        fn, combine = self.__fn, self.__combine
+
+        if combine == "nest":
+            a, b = values
+            return (multo_list._multo_new(list(fn([a, repeat(bb, len(a))]))) for bb in b)
+
+        elif combine == "zip":
+            if len(set(map(len, values))) > 1:
+                raise IndexError("Non-equal length of zipped multos")
+
+        elif combine == "flat":
+            return fn(_flat_columns(values))
+
+        return fn(values)
+
+    def __force(self):
+        if self.__combine == "nest":
+            values = [source.multo for source in self.__sources]
+            flat = multo_list._multo_new(list(self.__fn(_flat_columns(values))))
+            result = flat.multo_reshape(*_nest_shape(values))
+        else:
+            result = multo_list._multo_new(list(self.__evaluate()))
+        self.__sources = self.__fn = self.__combine = None
+        self.__depth = 0
+        self._multo_list__multo = result._multo_list__multo
+        self._multo_list__shape = result._multo_list__shape
+
+    def multo_iter(self):
+        '''
+        Iterate over the values of the expression, computing them on demand
+        in flat mode ordering without materializing the multo.
+        '''
+        if self.__sources is None:
+            return iter(self.multo)
+        return self.__evaluate()
+
+    def _multo_stream(self):
+        if self.__sources is None or self.__combine == "nest":
+            # evaluated into the storage, nest rows are computed all at once anyway
+            self.multo
+            return multo_list._multo_stream(self)
+        return self.__evaluate(), None
+
+    def multo_combinations(self):
+        '''
+        Iterate over the tuples of source elements the values are computed from,
+        in the same order as multo_iter.
+        '''
+        sources, fn, combine = self.__expression()
+        values = [source.multo for source in sources]
+
+        if combine == "nest":
+            a, b = values
+            return ((aa, bb) for bb in b for aa in a)
+        elif combine == "flat":
+            return _flat_product(values)
+        return zip(*values)
+
+    def _multo_list__unary(self, op):
+        sources, fn, combine = self.__expression()
+        return self.__node(sources, _mapped(op, [fn], [len(sources)]), combine, self.__fused_depth() + 1)
+
+    def _multo_list__binary(self, other, op):
+        if op in _MUTATING:
+            return multo_list._multo_list__binary(self, other, op)
+        return self._multo_apply(other, op, self.multo_mode)
+
+    def _multo_apply(self, other, op, mode=None):
+        sources, fa, combine = self.__expression()
+
+        if not isinstance(other, multo_list):
+            return self.__node(sources, _mapped_scalar(op, fa, other), combine, self.__fused_depth() + 1)
+
+        if not mode:
+            mode = _resolve_mode(self, other)
+
+        if _is_lazy(other):
+            other_sources, fb, other_combine = other.__expression()
+        else:
+            other_sources, fb, other_combine = [other], None, None
+
+        # operands of a product are evaluated at their own size, not for every combination
+        if mode != "zip" or combine not in (None, mode):
+            sources, fa, combine = [self], None, None
+
+        if mode != "zip" or other_combine not in (None, mode):
+            other_sources, fb, other_combine = [other], None, None
+
+        depth = max(self.__fused_depth(), other.__fused_depth() if _is_lazy(other) else 0)
+        fn = _mapped(op, [fa, fb], [len(sources), len(other_sources)])
+        return self.__node(sources + other_sources, fn, mode, depth + 1)
+
+    @classmethod
+    def _multo_combine(cls, multos, op, mode):
+        '''
+        Expression applying op to the items of any number of multos
+        combined in flat or zip mode.
+        '''
+        sources, fns, counts, depth = [], [], [], 0
+        for m in multos:
+            expression, fn, combine = m.__expression() if _is_lazy(m) else ([m], None, None)
+            if mode != "zip" or combine not in (None, mode):
+                expression, fn = [m], None
+            if _is_lazy(m):
+                depth = max(depth, m.__fused_depth())
+            sources += expression
+            fns.append(fn)
+            counts.append(len(expression))
+        return cls.__node(sources, _mapped(op, fns, counts), mode, depth + 1)
+
+
+class multo_frozen(multo_list):
+    '''
+    Immutable multo, usable as a dict key, set member or memoization key.
+    Equal to the multos of the same mode, shape and values, and hashed on them
+    once. Multo items are frozen too. Operators return new multos, in-place
+    ones included.
+    '''
+
+    __slots__ = ("__hash",)
+
+    def __init__(self, *args, **kwargs):
+        self._multo_from(multo_list(*args, **kwargs), self)
+
+    @classmethod
+    def _multo_from(cls, m, self=None):
+        if type(m) is cls:
+            return m
+        _evaluate(m)
+
+        values = _storage(m)
+        if type(values) in (array, memoryview):
+            # read-only buffer keeping the numeric paths
+            view = memoryview(values)
+            values = memoryview(view.tobytes()).cast(view.format)
+        elif type(values) is not range:
+            values = _pack(list(values))
+            if type(values) is array:
+                values = memoryview(values.tobytes()).cast(values.typecode)
+            else:
+                values = tuple(item.multo_freeze() if isinstance(item, multo_list) else item for item in values)
+
+        if self is None:
+            self = object.__new__(cls)
+        self._multo_list__multo = values
+        self._multo_list__mode = _mode(m)
+        self._multo_list__shape = _shape(m)
+        self.__hash = None
+        return self
+
+    @property
+    def multo(self):
+        return multo_list.multo.fget(self)
+
+    @multo.setter
+    def multo(self, value):
+        raise TypeError("multo_frozen is immutable")
+
+    @property
+    def multo_mode(self):
+        return multo_list.multo_mode.fget(self)
+
+    @multo_mode.setter
+    def multo_mode(self, value):
+        raise TypeError("multo_frozen is immutable")
+
+    def __hash__(self):
+        if self.__hash is None:
+            self.__hash = hash((_mode(self), _shape(self), tuple(_storage(self))))
+        return self.__hash
+
+    def __eq__(self, other):
+        if not isinstance(other, multo_list):
+            return False
+        _evaluate(other)
+        if _mode(self) != _mode(other) or _shape(self) != _shape(other):
+            return False
+        if type(other) is multo_frozen and hash(self) != hash(other):
+            return False
+        a, b = _storage(self), _storage(other)
+        return len(a) == len(b) and all(map(operator.eq, a, b))
+
+    def __reduce_ex__(self, protocol):
+        return _unpickle_frozen, multo_list.__reduce_ex__(self, protocol)
+
+
+def _unpickle_frozen(unpickle, args):
+    return unpickle(*args).multo_freeze()
+
+
 def _gen_dunder():
     for op in _DUNDER['binary']:
         print(f'    def {op}(self, other):\n        return self.__binary_proxy(other, operator.{op[2:-2]})\n')
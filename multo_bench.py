@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+'''
+Benchmarks of multo construction, operators, modes and decorator dispatch
+against plain Python and itertools baselines.
+
+Usage:
+
+    python multo_bench.py                           # all cases, 10 .. 10^4 elements
+    python multo_bench.py -n 10 1000 100000 -k flat
+    python multo_bench.py -o new.json -c old.json   # save results, compare with a previous run
+
+Results are saved as JSON: one record per (case, implementation, size) with
+the best time per call in seconds out of the repeats.
+'''
+
+from array import array
+from itertools import product, starmap
+import argparse
+import json
+import operator
+import platform
+import sys
+import time
+import timeit
+
+from multo import multo, multo_lazy
+
+
+SIZES = (10, 100, 1000, 10000)
+
+# size of the second operand of binary operators, flat and nest results have n * SIDE elements
+SIDE = 10
+
+
+class item:
+
+    def __init__(self, value):
+        self._value = value
+
+    def get_value(self):
+        return self._value
+
+    @property
+    def value(self):
+        return self._value
+
+
+@multo
+def decorated(a, b):
+    return a + b
+
+
+@multo(mode="nest")
+def decorated_nest(a, b):
+    return a + b
+
+
+@multo(batch=True)
+def decorated_batch(xs, ys):
+    return [x + y for x, y in zip(xs, ys)]
+
+
+def plain(a, b):
+    return a + b
+
+
+def _cases(n):
+    '''
+    Yields (case, implementation, statement, elements) for n elements,
+    elements being the number of values the statement produces.
+    '''
+    ints = list(range(n))
+    side = list(range(SIDE))
+    strs = [str(i) for i in ints]
+    objs = [item(i) for i in ints]
+
+    m_ints = multo(multo=array("q", ints))
+    m_list = multo(multo=list(ints))
+    m_side = multo(*side)
+    m_strs = multo(*strs)
+    m_objs = multo(*objs)
+    m_rows = multo(*(list(side) for i in ints))
+
+    yield "construct", "multo", lambda: multo(*ints), n
+    yield "construct", "multo_str", lambda: multo(*strs), n
+    yield "construct", "python", lambda: list(ints), n
+
+    yield "unary", "multo_array", lambda: -m_ints, n
+    yield "unary", "multo_list", lambda: -m_list, n
+    yield "unary", "python", lambda: [-x for x in ints], n
+    yield "unary", "itertools", lambda: list(map(operator.neg, ints)), n
+
+    for mode in ("flat", "nest", "zip"):
+        elements = n if mode == "zip" else n * SIDE
+        other_ints = multo(multo=array("q", ints if mode == "zip" else side), mode=mode)
+        other_list = multo(multo=list(ints if mode == "zip" else side), mode=mode)
+        other_strs = multo(*(strs if mode == "zip" else map(str, side)), mode=mode)
+        yield f"binary_{mode}", "multo_array", lambda b=other_ints: m_ints + b, elements
+        yield f"binary_{mode}", "multo_list", lambda b=other_list: m_list + b, elements
+        yield f"binary_{mode}", "multo_str", lambda b=other_strs: m_strs + b, elements
+        yield f"binary_{mode}", "multo_lazy", lambda b=other_ints: (multo_lazy(multo=ints) + b).multo, elements
+
+    yield "binary_flat", "python", lambda: [x + y for y in side for x in ints], n * SIDE
+    yield "binary_flat", "itertools", lambda: list(starmap(operator.add, product(ints, side))), n * SIDE
+    yield "binary_nest", "python", lambda: [[x + y for x in ints] for y in side], n * SIDE
+    yield "binary_zip", "python", lambda: [x + y for x, y in zip(ints, ints)], n
+    yield "binary_zip", "itertools", lambda: list(map(operator.add, ints, ints)), n
+
+    yield "chain", "multo", lambda: (m_ints * 2 + 1) ** 2 - m_side, n * SIDE
+    yield "chain", "multo_lazy", lambda: ((multo_lazy(multo=ints) * 2 + 1) ** 2 - m_side).multo, n * SIDE
+    yield "chain", "python", lambda: [(x * 2 + 1) ** 2 - y for y in side for x in ints], n * SIDE
+
+    # operators after the product, fused over its combinations
+    yield "chain_product", "multo", lambda: ((m_list - m_side) * 2 + 1) ** 2, n * SIDE
+    yield "chain_product", "multo_lazy", lambda: (((multo_lazy(multo=ints) - m_side) * 2 + 1) ** 2).multo, n * SIDE
+    yield "chain_product", "python", lambda: [((x - y) * 2 + 1) ** 2 for y in side for x in ints], n * SIDE
+
+    yield "ternary", "multo", lambda: operator.setitem(m_rows, 0, 1), n
+    yield "ternary", "python", lambda: [row.__setitem__(0, 1) for row in m_rows.multo], n
+
+    yield "decorated_scalar", "multo", lambda: decorated(1, 2), 1
+    yield "decorated_scalar", "python", lambda: plain(1, 2), 1
+
+    yield "decorated_multo", "multo", lambda: decorated(m_list, m_side), n * SIDE
+    yield "decorated_multo", "multo_batch", lambda: decorated_batch(m_list, m_side), n * SIDE
+    yield "decorated_multo", "python", lambda: [plain(x, y) for y in side for x in ints], n * SIDE
+    yield "decorated_multo", "itertools", lambda: [plain(x, y) for y, x in product(side, ints)], n * SIDE
+
+    yield "attribute_method", "multo", lambda: m_objs.get_value(), n
+    yield "attribute_method", "python", lambda: [x.get_value() for x in objs], n
+    yield "attribute_property", "multo", lambda: m_objs.value, n
+    yield "attribute_property", "python", lambda: [x.value for x in objs], n
+
+    a = multo(multo=ints[:max(1, n // (SIDE * SIDE))])
+    yield "deep_nest", "multo", lambda: decorated_nest(decorated_nest(a, m_side), m_side), len(a.multo) * SIDE * SIDE
+    yield "deep_nest", "python", lambda: [[[x + y + z for x in a.multo] for y in side] for z in side], len(a.multo) * SIDE * SIDE
+
+
+def measure(statement, repeat, min_time):
+    timer = timeit.Timer(statement)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    return min([elapsed] + timer.repeat(repeat - 1, number)) / number
+
+
+def run(sizes, keyword=None, repeat=3, min_time=0.05, out=sys.stdout):
+    results = []
+    for n in sizes:
+        for case, impl, statement, elements in _cases(n):
+            if keyword and keyword not in case:
+                continue
+            seconds = measure(statement, repeat, min_time)
+            results.append(dict(case=case, impl=impl, n=n, elements=elements, seconds=seconds))
+            print(f"{case:20} {impl:12} n={n:<8} {seconds * 1e6:12.2f} us  {seconds / elements * 1e9:10.1f} ns/element", file=out)
+    return results
+
+
+def compare(results, previous, out=sys.stdout):
+    '''
+    Print the ratio of new to previous times for the records present in both runs.
+    '''
+    old = {(r["case"], r["impl"], r["n"]): r["seconds"] for r in previous["results"]}
+    for r in results:
+        key = (r["case"], r["impl"], r["n"])
+        if key in old:
+            ratio = r["seconds"] / old[key]
+            flag = "  SLOWER" if ratio > 1.1 else "  faster" if ratio < 0.9 else ""
+            print(f"{r['case']:20} {r['impl']:12} n={r['n']:<8} {ratio:8.2f}x{flag}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="multo benchmarks")
+    parser.add_argument("-n", "--sizes", type=int, nargs="+", default=SIZES, help="element counts")
+    parser.add_argument("-k", "--keyword", help="only run cases containing this string")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="timing repeats, the best is kept")
+    parser.add_argument("-o", "--output", help="save results as JSON to this file")
+    parser.add_argument("-c", "--compare", help="JSON results of a previous run to compare with")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.keyword, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(dict(python=platform.python_version(), time=time.time(), results=results), f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            print()
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
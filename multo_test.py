@@ -469,3 +469,1021 @@ def test_dunder_multi():
 
     a = M(2, 4); b = 3; a -= b; assert a == M(2 - 3, 4 - 3)
     a = M(2, 4); b = 3; b -= a; assert b == M(3 - 2, 3 - 4)
+
+
+def test_numeric_storage():
+    from array import array
+
+    assert M(1, 2, 3).multo == [1, 2, 3]
+    assert isinstance(M(1.5, 2.5).multo, list)
+
+    # buffers given are kept, results are lists
+    a = M(multo=array('q', [1, 2, 3]))
+    assert isinstance(a.multo, array)
+    assert (a * 2).multo == [2, 4, 6]
+    assert a / 2 == M(0.5, 1.0, 1.5)
+    assert (a < 2).multo == [True, False, False]
+    assert (M(multo=array('q', [2**62])) * 4).multo == [2**64]
+
+
+def test_numeric_modes():
+    aa = M(2, 3, 4, 5)
+    bb = M(multo=[2, 4, 6])
+    cc = M(2, 4, 6)
+
+    assert aa * bb == aa * cc == M(4, 6, 8, 10, 8, 12, 16, 20, 12, 18, 24, 30)
+    assert 10 - M(1, 2) == M(9, 8)
+
+    aa = M(2, 3, 4, 5, mode="nest")
+    assert aa * cc == M(M(4, 6, 8, 10), M(8, 12, 16, 20), M(12, 18, 24, 30))
+
+    aa = M(2, 3, 4, mode="zip")
+    assert aa + cc == M(4, 7, 10)
+    with raises(IndexError):
+        aa + M(1, 2)
+
+    assert M(1, 2, mode="zip") + M(1, 2, mode="nest") == M(2, 4)
+
+    @multo
+    def custom_add(a, b):
+        return a+b
+
+    with raises(AttributeError):
+        custom_add(M(1, mode="zip"), M(1, mode="nest"))
+
+
+def test_lazy():
+    from multo import multo_lazy
+
+    k = M(1, 2)
+    m = multo_lazy(1, 2, 3)
+    r = (m * 2 + 1) ** 2 - k
+    assert r == (M(1, 2, 3) * 2 + 1) ** 2 - k
+    assert str(-r) == str(-((M(1, 2, 3) * 2 + 1) ** 2 - k))
+    assert 10 - multo_lazy(1, 2) == M(9, 8)
+    assert k + multo_lazy(1, 2) == M(2, 3, 3, 4)
+
+    z = multo_lazy(1, 2, mode="zip")
+    assert (z + M(10, 20)) * 2 + M(1, 1, mode="zip") == M(23, 45)
+    assert (z + M(10, 20)) + M(1, 2, 3) == M(12, 23, 13, 24, 14, 25)
+    with raises(IndexError):
+        str(z + M(1, 2, 3))
+
+    n = multo_lazy(1, 2, mode="nest")
+    assert n + M(10, 20) == M(M(11, 12), M(21, 22))
+
+    a = multo_lazy(strabc("a1"), strabc("a2"))
+    assert (a + M("b1", "b2")).text == M("a1b1", "a2b1", "a1b2", "a2b2")
+
+    # chained inputs are evaluated before their storage and shape are read
+    chained = lambda: multo_lazy(1, 2, mode="nest") + M(1, 2, 3)
+    assert chained().multo_shape == (3, 2)
+    assert chained().multo_take(0) == M(2, 3)
+    assert chained().multo_ravel() == M(2, 3, 3, 4, 4, 5)
+    assert (multo_lazy(1, 2) + 0).multo_reshape(2, 1) == M(M(1), M(2))
+    assert multo(lambda a, b, c: a + b + c)(multo_lazy(1, 2) + 0, 1, 2) == M(4, 5)
+    assert multo(lambda a, b: a - b)(multo_lazy(1, 2) + 0, b=M(1, 2)) == M(0, 1, -1, 0)
+    assert multo(batch=True)(lambda xs: xs)(multo_lazy(1, 2) + 0) == M(1, 2)
+    rows = M([1, 2], [3, 4], mode="zip")
+    rows[0] = multo_lazy(5, 6) + 0
+    assert rows == M([5, 2], [6, 4])
+    assert (M(multo=[], mode="nest") + M(1, 2)).multo_take(0) == M(multo=[])
+
+
+def test_lazy_deferred():
+    from multo import multo_lazy
+
+    r = 1 / multo_lazy(1, 0)
+    with raises(ZeroDivisionError):
+        str(r)
+
+    a = multo_lazy([1, 2, 3], [4, 5])
+    del a[1]
+    assert a == M([1, 3], [4])
+
+    # long chains stay within the recursion limit
+    r = multo_lazy(1, 2, 3)
+    for i in range(3000):
+        r = r + 1
+    assert r == M(3001, 3002, 3003)
+    z, k = multo_lazy(1, 2, mode="zip"), M(0, 1, mode="zip")
+    for i in range(1001):
+        z = -(z * 1 + k)
+    assert z == M(-1, -3)
+    f, n = multo_lazy(1, 2), multo_lazy(1, 2, mode="nest")
+    e, en = M(1, 2), M(1, 2, mode="nest")
+    for i in range(1001):
+        f, n = f + M(0), n + M(0)
+        if i < 3:
+            e, en = e + M(0), en + M(0)
+    assert f == e and n == en
+
+    # decorated calls with three or keyword multo arguments are deferred too
+    calls = []
+
+    @multo
+    def add3(a, b, c=0):
+        calls.append(a)
+        return a + b + c
+
+    r = add3(multo_lazy(1, 2) * 1, M(10, 20), M(100, 200))
+    assert type(r) is multo_lazy and not calls
+    assert r == add3(M(1, 2), M(10, 20), M(100, 200))
+    assert len(calls) == 16
+    r = add3(multo_lazy(1, 2), 10, c=M(100, 200))
+    assert type(r) is multo_lazy
+    assert r == M(111, 112, 211, 212)
+    r = add3(multo_lazy(1, 2, mode="zip") + 1, M(10, 20, mode="zip"), c=M(100, 200, mode="zip"))
+    assert type(r) is multo_lazy
+    assert r == M(112, 223)
+    n = multo_lazy(1, 2, mode="nest")
+    assert add3(n, M(10), M(100)) == add3(M(1, 2, mode="nest"), M(10), M(100))
+
+
+def test_stream():
+    from multo import multo_lazy
+
+    calls = []
+
+    @multo
+    def score(a, b):
+        calls.append((a, b))
+        return a * 10 + b
+
+    aa = multo_lazy(1, 2, 3)
+    bb = M(4, 5)
+
+    r = score(aa, bb)
+    assert not calls
+    assert list(r.multo_combinations()) == [(1, 4), (2, 4), (3, 4), (1, 5), (2, 5), (3, 5)]
+
+    chunks = r.multo_chunks(4)
+    assert next(chunks) == M(14, 24, 34, 15)
+    assert len(calls) == 4
+    assert next(chunks) == M(25, 35)
+    assert list(chunks) == []
+
+    assert score(aa, bb) + 1 == score(M(1, 2, 3), bb) + 1
+    assert list(score(2, multo_lazy(1, 2)).multo_iter()) == [21, 22]
+    assert list((aa * 2).multo_iter()) == [2, 4, 6]
+    assert list(M(1, 2, 3).multo_chunks(2)) == [M(1, 2), M(3)]
+
+
+@multo(workers=2)
+def pool_multiply(a, b):
+    return a*b+1
+
+
+@multo(mode="nest", workers=2)
+def pool_multiply_nest(a, b):
+    return a*b+1
+
+
+@multo(workers=2, shared="d")
+def pool_divide_shared(a, b):
+    return a / b
+
+
+@multo(workers=2, shared="q")
+def pool_divide_shared_ints(a, b):
+    return a / b
+
+
+def test_pool():
+    from concurrent.futures import ThreadPoolExecutor
+
+    aa = M(2, 3, 4, 5)
+    bb = M(multo=[2, 4, 6])
+
+    assert pool_multiply(2, 3) == 7
+    assert pool_multiply(aa, 3) == M(7, 10, 13, 16)
+    assert pool_multiply(aa, bb) == M(5, 7, 9, 11, 9, 13, 17, 21, 13, 19, 25, 31)
+    assert pool_multiply(aa, M(2, 4, 6, 8), mode="zip") == M(5, 13, 25, 41)
+    assert pool_multiply_nest(aa, bb) == M(M(5, 7, 9, 11), M(9, 13, 17, 21), M(13, 19, 25, 31))
+
+    shared = pool_divide_shared(aa, M(1, 2))
+    assert type(shared.multo) is memoryview
+    assert shared == M(2.0, 3.0, 4.0, 5.0, 1.0, 1.5, 2.0, 2.5)
+    assert pool_divide_shared(aa, M(1, 2), mode="nest").multo_shape == (2, 4)
+    assert shared + M(0, 1) == M(2.0, 3.0, 4.0, 5.0, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 2.0, 2.5, 3.0, 3.5)
+    assert pool_divide_shared(M(M(1, 2), 3), 2.0) == M(M(0.5, 1.0), 1.5)
+    assert pool_divide_shared(M(multo=[]), 2.0) == M(multo=[])
+    assert pool_divide_shared(1, 4) == 0.25
+
+    # the error of results not fitting the typecode, not that of closing the block
+    with raises(TypeError):
+        pool_divide_shared_ints(aa, M(1, 2))
+
+    with ThreadPoolExecutor(2) as executor:
+
+        @multo(executor=executor)
+        def custom_multiply(a, b):
+            return a*b+1
+
+        assert custom_multiply(aa, bb) == pool_multiply(aa, bb)
+
+        @multo(executor=executor, shared="q")
+        def shared_multiply(a, b):
+            return a*b+1
+
+        assert shared_multiply(aa, bb) == pool_multiply(aa, bb)
+
+
+def test_async():
+    import asyncio
+
+    running = []
+    peak = []
+
+    @multo(concurrency=2)
+    async def custom_multiply(a, b):
+        running.append(a)
+        peak.append(len(running))
+        await asyncio.sleep(0.001)
+        running.pop()
+        return a*b+1
+
+    aa = M(2, 3, 4, 5)
+    bb = M(multo=[2, 4, 6])
+
+    assert asyncio.run(custom_multiply(2, 3)) == 7
+    assert asyncio.run(custom_multiply(aa, bb)) == M(5, 7, 9, 11, 9, 13, 17, 21, 13, 19, 25, 31)
+    assert max(peak) == 2
+
+    @multo(mode="nest")
+    async def custom_multiply_nest(a, b):
+        return a*b+1
+
+    assert asyncio.run(custom_multiply_nest(aa, bb)) == M(M(5, 7, 9, 11), M(9, 13, 17, 21), M(13, 19, 25, 31))
+    assert asyncio.run(custom_multiply_nest(aa, M(2, 4, 6, 8), mode="zip")) == M(5, 13, 25, 41)
+
+
+def test_threads():
+    import threading
+    from multo import multo_threads
+
+    threads = set()
+
+    class hashed(strabc):
+
+        def digest(self, salt):
+            threads.add(threading.current_thread())
+            return self.text + salt
+
+        def __len__(self):
+            threads.add(threading.current_thread())
+            return len(self.text)
+
+    aa = M(*(hashed(str(i)) for i in range(20)))
+
+    multo_threads(4)
+    try:
+        assert aa.digest("x") == M(*(str(i) + "x" for i in range(20)))
+        assert inner_len(aa) == M(*(len(str(i)) for i in range(20)))
+        assert inner_len(M(M("a", "bb"), "ccc")) == M(M(1, 2), 3)
+        assert threading.current_thread() not in threads
+    finally:
+        multo_threads(0)
+
+    threads.clear()
+    assert aa.digest("x") == M(*(str(i) + "x" for i in range(20)))
+    assert threads == {threading.current_thread()}
+
+
+def test_cache():
+    calls = []
+
+    @multo(cache=4)
+    def custom_multiply(a, b):
+        calls.append((a, b))
+        return a*b+1
+
+    aa = M(2, 3, 2, 3)
+    bb = M(multo=[2, 4, 2])
+
+    assert custom_multiply(aa, bb) == M(5, 7, 5, 7, 9, 13, 9, 13, 5, 7, 5, 7)
+    assert len(calls) == 4
+    assert custom_multiply.cache_info().hits == 8
+    assert custom_multiply.cache_info().misses == 4
+
+    assert custom_multiply(2, 2) == 5
+    assert len(calls) == 4
+
+    custom_multiply.cache_clear()
+    assert custom_multiply(2, 2) == 5
+    assert len(calls) == 5
+
+    @multo(cache=True)
+    def custom_len(a, b):
+        calls.append((a, b))
+        return len(a) + b
+
+    assert custom_len(M([1], [1]), 2) == M(3, 3)
+    assert len(calls) == 7
+    assert custom_len.cache_info().currsize == 0
+
+
+persist_calls = []
+
+
+def persist_multiply(a, b):
+    persist_calls.append((a, b))
+    return a*b+1
+
+
+def persist_name(f):
+    persist_calls.append(f)
+    return f.__name__
+
+
+def test_persist(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Lock
+    from multo import multo_store
+
+    # module level functions, as a closure over calls would change with it
+    calls = persist_calls
+    custom_multiply = persist_multiply
+    path = tmp_path / "results.db"
+
+    persisted = multo(persist=path)(custom_multiply)
+    aa = M(2, 3, 2, 3)
+    bb = M(multo=[2, 4, 2])
+
+    assert persisted(aa, bb) == M(5, 7, 5, 7, 9, 13, 9, 13, 5, 7, 5, 7)
+    assert len(calls) == 4
+    assert persisted.persist_info()[:2] == (8, 4)
+    assert persisted.persist_info().entries == 4
+
+    # a rerun, e.g. in a new process, computes the new combinations only
+    persisted = multo(persist=path)(custom_multiply)
+    assert persisted(M(2, 3, 5), bb, mode="nest") == M(M(5, 7, 11), M(9, 13, 21), M(5, 7, 11))
+    assert calls[4:] == [(5, 2), (5, 4)]
+    assert persisted(2, 4) == 9 and persisted(b=4, a=2) == 9 and len(calls) == 7
+    assert persisted(M(M(2, 3), 5), 2) == M(M(5, 7), 11) and len(calls) == 7
+
+    custom_name = multo(persist=path)(persist_name)
+
+    # unpicklable combinations are computed every time
+    assert custom_name(M(len, lambda: 0)) == M("len", "<lambda>")
+    assert custom_name(M(len, lambda: 0)) == M("len", "<lambda>") and len(calls) == 10
+
+    # another version invalidates the stored results
+    store = multo_store(path, limit=100)
+    versioned = multo(persist=store, version=2)(custom_multiply)
+    assert versioned(M(2, 3), 2) == M(5, 7) and len(calls) == 12
+    assert versioned.persist_info().entries == 2
+
+    # least recently used results are evicted
+    versioned(M(*range(50)), 1)
+    assert 0 < store.info()[1] <= 100
+    assert versioned(49, 1) == 50 and versioned.persist_info().hits == 1
+
+    versioned.persist_clear()
+    assert store.info() == (0, 0)
+
+    with ThreadPoolExecutor(2) as executor:
+        pooled = multo(persist=path, executor=executor, mode="zip")(custom_multiply)
+        assert pooled(aa, M(1, 2, 3, 4)) == M(3, 7, 7, 13)
+        assert pooled(aa, M(1, 2, 3, 4)) == M(3, 7, 7, 13)
+        assert pooled.persist_info()[:2] == (4, 4)
+
+    def scaled(k):
+        return multo(persist=path)(lambda x: x * k)
+
+    assert scaled(2)(M(1, 2, 3)) == M(2, 4, 6)
+    assert scaled(3)(M(1, 2, 3)) == M(3, 6, 9)
+    assert scaled(2)(4) == 8 and scaled(2).persist_info().entries == 4
+    with raises(TypeError):
+        scaled(Lock())
+    lock = Lock()
+    assert multo(persist=path, version=1)(lambda x: (lock, x)[1])(M(1, 2)) == M(1, 2)
+
+    # versions and keys of sets are the same in every process
+    import os, subprocess, sys
+    script = ("from multo import _code_version, _persist_key, _closure_digest\n"
+              "def g(a): return a in {'alpha', 'beta', 'gamma'}\n"
+              "print(_code_version(g), _persist_key((({'p', 'q', 'r'},), {})).hex(), _closure_digest((lambda s: lambda: s)({'x', 'y'})))")
+    outputs = {subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+               for seed in ("1", "2", "3")}
+    assert len(outputs) == 1
+
+
+def test_construction():
+    a = M(1, 2, 3)
+
+    with raises(AttributeError):
+        a.foo = 1
+
+    b = a + 1
+    assert type(b) is type(a)
+    assert b.multo_mode is None
+    assert M("a", mode="zip").multo_mode == "zip"
+    assert 2 ** M(1, 2) == M(2, 4)
+    assert divmod(M(7), 2) == M((3, 1))
+
+    import weakref
+    from multo import multo_lazy, multo_frozen
+    for m in (a, multo_lazy(1), multo_frozen(1)):
+        assert weakref.ref(m)() is m
+    cache = weakref.WeakValueDictionary(key=M(1, 2))
+    assert len(cache) == 0
+
+
+def test_cls_proxy_cache():
+    from multo import _PROXIES
+
+    class strxyz(strabc):
+
+        def get_text(self):
+            return "xyz"
+
+    aa = M(strabc("a"), strabc("b"))
+    assert aa.get_text() == M("a", "b")
+    assert aa.appended(s="c") == M("ac", "bc")
+    assert aa.text == M("a", "b")
+    assert _PROXIES[(strabc, "get_text")][1][0] == "method"
+    assert _PROXIES[(strabc, "text")][1][0] == "attribute"
+
+    bb = M(strabc("a"), strxyz("b"))
+    assert bb.get_text() == M("a", "xyz")
+    assert bb.text == M("a", "b")
+
+    cc = M(strxyz("a"), strxyz("b"))
+    assert cc.get_text() == M("xyz", "xyz")
+    assert cc._s == M("a", "b")
+
+    # instance attributes and changes of the class are seen
+    b = strxyz("b")
+    b.get_text = lambda: "own"
+    assert M(strxyz("a"), b).get_text() == M("xyz", "own")
+    strxyz.get_text = lambda self: "new"
+    assert cc.get_text() == M("new", "new")
+
+    from multo import _PROXIES_MAX
+    for i in range(_PROXIES_MAX + 1):
+        getattr(cc, f"text{i}", None)
+    assert len(_PROXIES) <= _PROXIES_MAX
+
+
+def test_profile():
+    from multo import multo_profile
+
+    @multo
+    def custom_multiply(a, b):
+        return a*b+1
+
+    calls = []
+    stats = multo_profile(callback=lambda *call: calls.append(call))
+    try:
+        custom_multiply(M(1, 2, 3), M(1, 2))
+        custom_multiply(M(1, 2), M(1, 2), mode="zip")
+        custom_multiply(2, 3)
+        M(1, 2) + M(1, 2, 3)
+        3 - M("a", "b").multo_inner_len()
+    finally:
+        multo_profile(False)
+
+    custom_multiply(M(1, 2), 2)
+
+    record = stats[custom_multiply.__qualname__]
+    assert record["calls"] == 3
+    assert record["elements"] == 6 + 2 + 1
+    assert record["size"] == 6 + 2 + 1
+    assert record["modes"] == {"flat": 1, "zip": 1, None: 1}
+    assert record["seconds"] > 0
+
+    assert stats["add"]["elements"] == 6
+    assert stats["len"]["calls"] == 1
+    assert stats["rsub"]["size"] == 2
+    assert len(calls) == 6
+    assert calls[-1][:3] == ("rsub", None, 2)
+    assert "rsub" in str(stats)
+
+
+def test_nary():
+
+    @multo
+    def weighted(a, b, c, scale=1, offset=0):
+        return (a + 10*b + 100*c) * scale + offset
+
+    aa = M(1, 2)
+    bb = M(3, 4)
+    cc = M(5, 6)
+
+    assert weighted(1, 3, 5) == 531
+    assert weighted(aa, 3, 5) == M(531, 532)
+    assert weighted(aa, bb, cc) == M(531, 532, 541, 542, 631, 632, 641, 642)
+    assert weighted(aa, 3, cc, offset=M(0, 1000)) == M(531, 532, 631, 632, 1531, 1532, 1631, 1632)
+    assert weighted(1, c=5, b=bb, scale=M(1, 2)) == M(531, 541, 1062, 1082)
+    assert weighted(aa, bb, cc, mode="zip") == M(531, 642)
+    assert weighted(aa, bb, cc, mode="nest") == M(M(M(531, 532), M(541, 542)), M(M(631, 632), M(641, 642)))
+
+    with raises(IndexError):
+        weighted(aa, bb, M(1, 2, 3), mode="zip")
+
+    with raises(AttributeError):
+        weighted(aa, M(1, mode="zip"), M(1, mode="nest"))
+
+    assert weighted(M(M(1, 2), 3), 0, 0) == M(M(1, 2), 3)
+
+    a = M([1, 2], [3, 4], mode="zip")
+    a[0] = M(5, 6)
+    assert a == M([5, 2], [6, 4])
+
+
+def test_nest_shape():
+
+    @multo(mode="nest")
+    def weighted(a, b, c):
+        return a + 10*b + 100*c
+
+    r = weighted(M(1, 2), M(3, 4, 5), M(6, 7, 8, 9))
+    assert r.multo_shape == (4, 3, 2)
+    assert len(r) == 4
+    assert r.multo[0] == M(M(631, 632), M(641, 642), M(651, 652))
+    assert r.multo_ravel() == M(*(a + 10*b + 100*c for c in (6, 7, 8, 9) for b in (3, 4, 5) for a in (1, 2)))
+    assert r.multo_ravel().multo is r.multo_ravel().multo
+
+    assert r.multo_take(0) == M(M(631, 632), M(641, 642), M(651, 652))
+    assert r.multo_take(1, axis=1) == M(M(641, 642), M(741, 742), M(841, 842), M(941, 942))
+    assert r.multo_take(-1, axis=2) == r.multo_take(1, axis=2)
+    assert r.multo_take(0, axis=2).multo_shape == (4, 3)
+    with raises(IndexError):
+        r.multo_take(2, axis=2)
+
+    q = r.multo_reshape(2, -1)
+    assert q.multo_shape == (2, 12)
+    assert q.multo_ravel() == r.multo_ravel()
+    with raises(ValueError):
+        r.multo_reshape(5, 5)
+
+    assert (r - 600).multo_shape == (4, 3, 2)
+    assert (r - 600).multo[0] == M(M(31, 32), M(41, 42), M(51, 52))
+    assert (-r).multo_take(0) == -r.multo_take(0)
+    assert (r + r.multo_reshape(*r.multo_shape)).multo_shape != (4, 3, 2)
+
+    z = r.multo_reshape(*r.multo_shape)
+    z.multo_mode = "zip"
+    assert (z + r).multo_ravel() == r.multo_ravel() * 2
+
+    @multo(mode="nest")
+    def custom_add(a, b):
+        return a + b
+
+    n = custom_add(custom_add(M(1, 2), M(10, 20)), M(100, 200))
+    assert n.multo_shape == (2, 2, 2)
+    assert n == M(M(M(111, 112), M(121, 122)), M(M(211, 212), M(221, 222)))
+    assert inner_int(n).multo_shape == (2, 2, 2)
+
+    aa = M(strabc(), strabc(""), strabc("x"))
+    bb = M(strabc('a'), strabc('b'), mode='nest')
+    assert (aa + bb).text.multo_shape == (2, 3)
+    assert (aa + bb).appended("!") == M(M('abca!', 'a!', 'xa!'), M('abcb!', 'b!', 'xb!'))
+
+    e = multo(multo=[], mode="nest") + M("a", "b")
+    assert str(e) == "~[ ~[  ]~, ~[  ]~ ]~" and e == M(M(multo=[]), M(multo=[]))
+    assert custom_add(M(multo=[]), M(1, 2)) == M(M(multo=[]), M(multo=[]))
+
+
+def test_reduce():
+    import operator
+
+    a = M(3, 1, 2)
+    assert a.multo_sum() == 6
+    assert a.multo_min() == 1
+    assert a.multo_max() == 3
+    assert a.multo_mean() == 2
+    assert a.multo_reduce(operator.mul) == 6
+    assert a.multo_reduce(operator.mul, 10) == 60
+    assert M("a", "b").multo_reduce(operator.add) == "ab"
+    assert M(0, 1).multo_any() and not M(0, 1).multo_all()
+    with raises(ValueError):
+        M(multo=[]).multo_mean()
+
+    n = M(1, 2, 3, mode="nest") * M(1, 10)
+    assert n.multo_shape == (2, 3)
+    assert n.multo_sum() == 66
+    assert n.multo_sum(axis=0) == M(11, 22, 33)
+    assert n.multo_sum(axis=1) == M(6, 60)
+    assert n.multo_max(axis=-1) == M(3, 30)
+    assert n.multo_mean(axis=0) == M(5.5, 11.0, 16.5)
+    assert n.multo_reduce(operator.mul, axis=1) == M(6, 6000)
+
+    @multo(mode="nest")
+    def weighted(a, b, c):
+        return a + 10*b + 100*c
+
+    r = weighted(M(1, 2), M(3, 4, 5), M(6, 7))
+    assert r.multo_sum(axis=1).multo_shape == (2, 2)
+    assert r.multo_sum(axis=1) == M(M(1923, 1926), M(2223, 2226))
+    assert r.multo_sum(axis=0).multo_sum(axis=0).multo_sum() == r.multo_sum()
+
+    from multo import multo_lazy
+    assert (multo_lazy(1, 2, 3, mode="nest") * M(1, 10)).multo_sum() == 66
+    assert (multo_lazy(1, 2, 3, mode="nest") * M(1, 10)).multo_sum(axis=1) == M(6, 60)
+
+    # empty axes reduce to the value of fn on an empty slice
+    e = M(multo=[], mode="nest") + M(1, 2)
+    assert e.multo_shape == (2, 0)
+    assert e.multo_sum(axis=1) == M(0, 0)
+    assert e.multo_sum(axis=0) == M(multo=[])
+    assert e.multo_any(axis=-1) == M(False, False)
+    with raises(ValueError):
+        e.multo_max(axis=1)
+
+    with raises(ValueError):
+        bool(M(multo=[]))
+    with raises(ValueError):
+        bool(M(1, 0, 1))
+
+
+def test_dispatch():
+    from multo import multo_profile
+
+    @multo
+    def place(a, b, c=0):
+        return a + 10*b + 100*c
+
+    # the same function with every kind of argument signature, in any order
+    assert place(1, 2) == 21
+    assert place(M(1, 2), 3) == M(31, 32)
+    assert place(1, M(2, 3)) == M(21, 31)
+    assert place(1, 2) == 21
+    assert place(1, 2, c=M(1, 2)) == M(121, 221)
+    assert place(1, b=2, c=3) == 321
+    assert place(1, M(2, 3), M(4, 5)) == M(421, 431, 521, 531)
+    assert place(M(1, 2), 3, 4) == M(431, 432)
+    assert place(1.5, 2) == 21.5
+    assert place(M(M(1, 2), 3), 4) == M(M(41, 42), 43)
+
+    calls = []
+    multo_profile(callback=lambda name, mode, elements, seconds, size: calls.append(elements))
+    try:
+        place(1, 2)
+        place(M(1, 2), 3)
+    finally:
+        multo_profile(False)
+    assert calls == [1, 2]
+
+
+def test_inplace():
+    from array import array
+
+    a = M(1, 2, 3)
+    acc = a
+    acc += 10
+    acc *= M(1, 2, 3, mode="zip")
+    assert acc is a
+    assert a == M(11, 24, 39)
+
+    rows = M([1], [2], mode="zip")
+    items = rows.multo
+    rows += M([3], [4])
+    assert rows == M([1, 3], [2, 4])
+    assert rows.multo is items
+
+    b = M(1.5, 2.5)
+    c = b
+    c -= 1
+    assert c is b and c == M(0.5, 1.5)
+
+    # int values divided no longer fit the buffer
+    d = M(multo=array('q', [1, 2]))
+    e = d
+    e /= 2
+    assert e is not d and e == M(0.5, 1.0) and d == M(1, 2)
+
+    # other shapes and modes expand as with the binary operators
+    f = M(1, 2)
+    g = f
+    g += M(10, 20)
+    assert g is not f and g == M(11, 12, 21, 22)
+
+    n = M(1, 2, 3, mode="nest") * M(1, 10)
+    m = n
+    m += 1
+    assert m is n and m.multo_shape == (2, 3)
+    assert n == M(M(2, 3, 4), M(11, 21, 31))
+
+    with raises(IndexError):
+        h = M(1, 2, mode="zip")
+        h += M(1, 2, 3)
+
+
+def test_view():
+    from array import array
+
+    buffer = array('q', range(10))
+    m = M(multo=buffer)
+    assert m.multo is buffer
+    assert M(multo=range(4)) * 2 == M(0, 2, 4, 6)
+    assert M(multo=b"ab") + 1 == M(98, 99)
+    assert M(multo=memoryview(buffer)[::3]) == M(0, 3, 6, 9)
+    with raises(AssertionError):
+        M(multo="abc")
+
+    assert m.multo_view[-1] == 9
+    v = m.multo_view[2:5]
+    assert v == M(2, 3, 4)
+    v += 10
+    assert buffer[2:6] == array('q', [12, 13, 14, 5])
+    assert m.multo_view[::4].multo_view[1:] == M(14, 8)
+
+    items = [1, 2, 3, 4]
+    w = M(multo=items).multo_view[1:3]
+    w *= 10
+    assert items == [1, 20, 30, 4]
+    assert w.multo_view[::-1] == M(30, 20)
+    assert M(multo=items).multo_view[::2] + M(1, 1, mode="zip") == M(2, 31)
+
+    # views over immutable storage leave it alone and build a new multo
+    t = M(multo=(1, 2, 3))
+    v = t.multo_view[0:2]
+    v += 1
+    assert v == M(2, 3) and t.multo == (1, 2, 3)
+    e = M("a", "b", "a").multo_encode()
+    v = e.multo_view[1:]
+    v += "!"
+    assert v == M("b!", "a!") and e == M("a", "b", "a")
+    from multo import multo_frozen
+    f = multo_frozen("a", "b")
+    v = f.multo_view[:1]
+    v *= 2
+    assert v == M("aa") and f == M("a", "b")
+
+    n = M(1, 2, 3, mode="nest") * M(1, 10, 100)
+    assert n.multo_view[1] == M(10, 20, 30)
+    assert n.multo_view[1:].multo_shape == (2, 3)
+    assert n.multo_view[::2] == M(M(1, 2, 3), M(100, 200, 300))
+    with raises(IndexError):
+        n.multo_view[3]
+
+    from multo import multo_frozen
+
+    # every numeric storage on the left of flat and nest operators
+    for left in (range(1, 3), memoryview(array('q', [1, 2])), multo_frozen(1, 2).multo):
+        assert M(multo=left) + M(10, 20) == M(11, 12, 21, 22)
+        assert M(multo=left, mode="nest") + M(10, 20) == M(M(11, 12), M(21, 22))
+        assert M(multo=left) * M(multo=range(2)) == M(0, 0, 1, 2)
+    assert multo_frozen(1, 2) + M(10, 20) == M(11, 12, 21, 22)
+
+
+def test_pickle():
+    import copy
+    import pickle
+
+    from array import array
+
+    n = M(multo=array('d', [1.5, 3.0, 4.5, 10.0, 20.0, 30.0])).multo_reshape(2, 3)
+    items = M(M("a", "b", mode="zip"), [1], mode="flat")
+
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        for m in (M(1, 2), M(1.5), n, items, M(multo=range(3)), M(multo=[4, 5, 6]).multo_view[1:], M(7, 8, 9).multo_view[::2]):
+            r = pickle.loads(pickle.dumps(m, protocol))
+            assert r == m
+            assert r.multo_mode == m.multo_mode and r.multo_shape == m.multo_shape
+    assert pickle.loads(pickle.dumps(items)).multo[0].multo_mode == "zip"
+
+    buffers = []
+    data = pickle.dumps(n, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 1 and len(data) < 200
+    r = pickle.loads(data, buffers=buffers)
+    assert r == n and r.multo_shape == (2, 3)
+    r += 1
+    assert buffers[0].raw()[:8] == memoryview(r.multo_ravel().multo).cast("B")[:8]
+
+    c = copy.copy(M(1, 2))
+    c += 1
+    assert c == M(2, 3)
+    assert copy.deepcopy(items) == items
+
+    from multo import multo_frozen, multo_lazy
+
+    objs = M(strabc("a"), strabc("b"), mode="zip")
+    d = copy.deepcopy(objs)
+    assert d == objs and d.multo_mode == "zip" and d.multo[0] is not objs.multo[0]
+    arrays = copy.deepcopy(M(array('q', [1]), array('q', [2])))
+    assert arrays == M(array('q', [1]), array('q', [2]))
+    assert copy.deepcopy(n).multo_shape == (2, 3) and copy.copy(n) == n
+    assert copy.deepcopy(multo_frozen(1, 2)) == multo_frozen(1, 2)
+    assert copy.deepcopy(multo_lazy(1, 2) + M(1, 2)) == M(2, 3, 3, 4)
+
+
+def test_mapped(tmp_path):
+    from multo import multo_open, multo_lazy
+
+    m = M(*range(10)).multo_dump(tmp_path / "ints", size=3)
+    assert m == M(*range(10))
+    assert (tmp_path / "ints").stat().st_size == 80
+    assert m * 2 + 1 == M(*range(1, 21, 2))
+    assert m.multo_sum() == 45 and m.multo_max() == 9
+
+    # read-only maps fall back to a new multo, writable ones update the file
+    r = m
+    r += 1
+    assert r is not m
+    w = multo_open(tmp_path / "ints", "q", writable=True)
+    w += 1
+    assert multo_open(tmp_path / "ints", "q") == M(*range(1, 11))
+
+    n = (M(1, 2, 3, mode="nest") * M(1.0, 10.0)).multo_dump(tmp_path / "nest")
+    assert n.multo_shape == (2, 3) and n.multo_mode is None
+    assert n.multo_sum(axis=1) == M(6.0, 60.0)
+    assert m + M(0, 100) == M(*range(1, 11), *range(101, 111))
+    assert multo_open(tmp_path / "nest", "d", mode="nest") * M(1, 2) == M(M(1.0, 2.0, 3.0, 10.0, 20.0, 30.0), M(2.0, 4.0, 6.0, 20.0, 40.0, 60.0))
+
+    lazy = multo_lazy(multo=w.multo) * 0.5 + M(0, 100)
+    streamed = lazy.multo_dump(tmp_path / "lazy", size=4)
+    assert streamed == (M(*range(1, 11)) * 0.5 + M(0, 100))
+    assert multo_open(tmp_path / "lazy", "d") == streamed
+
+    assert multo_lazy(1, 2, mode="nest").multo_dump(tmp_path / "n", "q") == M(1, 2)
+    (tmp_path / "empty").touch()
+    assert multo_open(tmp_path / "empty") == M(multo=[])
+    with raises(TypeError):
+        M("a", "b").multo_dump(tmp_path / "strs")
+    assert not (tmp_path / "strs").exists()
+
+    # the type does not depend on the chunk size, failed dumps keep the file
+    for size in (1, 2, 3, 10):
+        assert M(1, 2, 3, 4.5, 5).multo_dump(tmp_path / "mixed", size=size) == M(1.0, 2.0, 3.0, 4.5, 5.0)
+        assert M(1.5, 2, 3).multo_dump(tmp_path / "mixed", size=size) == M(1.5, 2.0, 3.0)
+    with raises(TypeError):
+        M(1, 2, "x").multo_dump(tmp_path / "mixed", size=2)
+    assert multo_open(tmp_path / "mixed") == M(1.5, 2.0, 3.0)
+    with raises(OverflowError):
+        M(2 ** 70).multo_dump(tmp_path / "mixed")
+    with raises(TypeError):
+        M(True, False).multo_dump(tmp_path / "mixed")
+    assert multo_open(tmp_path / "mixed") == M(1.5, 2.0, 3.0)
+    assert M(True, False).multo_dump(tmp_path / "bools", "b") == M(1, 0)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bools", "empty", "ints", "lazy", "mixed", "n", "nest"]
+
+
+def test_batch():
+    batches = []
+
+    @multo(batch=True)
+    def scale(xs, ys, offset=None):
+        batches.append(len(xs))
+        return [x * y + (offset[i] if offset else 0) for i, (x, y) in enumerate(zip(xs, ys))]
+
+    assert scale(M(1, 2), M(10, 100)) == M(10, 20, 100, 200)
+    assert scale(2, 3) == 6
+    assert scale(M(1, 2), 3, offset=M(0, 1)) == M(3, 6, 4, 7)
+    assert scale(M(1, 2), M(10, 100), mode="zip") == M(10, 200)
+    assert batches == [4, 1, 4, 2]
+
+    nest = scale(M(1, 2, 3), M(1, 10), mode="nest")
+    assert nest.multo_shape == (2, 3)
+    assert nest == M(M(1, 2, 3), M(10, 20, 30))
+    assert scale(M(M(1, 2), 3), 2) == M(M(2, 4), 6)
+    assert scale(M(multo=[]), 2) == M(multo=[])
+
+    @multo(batch=3)
+    def square(xs):
+        batches.append(len(xs))
+        return [x * x for x in xs]
+
+    del batches[:]
+    assert square(M(*range(7))) == M(0, 1, 4, 9, 16, 25, 36)
+    assert batches == [3, 3, 1]
+
+    @multo(batch=True)
+    def broken(xs):
+        return xs[1:]
+
+    with raises(ValueError):
+        broken(M(1, 2))
+
+
+def test_frozen():
+    import pickle
+    from multo import multo_frozen
+
+    f = multo_frozen(1, 2, mode="zip")
+    assert f == M(1, 2, mode="zip") and f != M(1, 2) and f != multo_frozen(1, 2)
+    assert hash(f) == hash(M(1.0, 2.0, mode="zip").multo_freeze())
+    assert {f: "a"}[multo_frozen(1, 2, mode="zip")] == "a"
+    assert len({f, f.multo_freeze(), multo_frozen(2, 1, mode="zip"), multo_frozen(1, 2)}) == 3
+    assert f.multo_freeze() is f
+
+    with raises(TypeError):
+        f.multo = [3]
+    with raises(TypeError):
+        f.multo_mode = "flat"
+    g = f
+    g += 1
+    assert g == M(2, 3) and f == M(1, 2, mode="zip") and g is not f
+    assert f * M(1, 10, mode="zip") == M(1, 20)
+
+    items = M(M(1, 2), "a", [3])
+    frozen = M(M(1, 2), "a", (3,)).multo_freeze()
+    assert frozen.multo[0] == multo_frozen(1, 2)
+    with raises(TypeError):
+        hash(items.multo_freeze())
+
+    n = (M(1, 2, mode="nest") * M(1, 10)).multo_freeze()
+    assert n.multo_shape == (2, 2) and hash(n) != hash(n.multo_ravel().multo_freeze())
+    assert pickle.loads(pickle.dumps(n)) == n and type(pickle.loads(pickle.dumps(frozen))) is multo_frozen
+
+    uniques, inverse = M(3, 1, 3, 2, 1, mode="zip").multo_unique()
+    assert uniques == M(3, 1, 2) and inverse == M(0, 1, 0, 2, 1)
+    assert inverse.multo_mode == "zip"
+
+    uniques, inverse = (M(1, 2, 3, mode="nest") * M(1, 0)).multo_unique()
+    assert uniques == M(1, 2, 3, 0) and inverse.multo_shape == (2, 3)
+    assert inverse == M(M(0, 1, 2), M(3, 3, 3))
+
+    uniques, inverse = M(M(1, 2), M(1, 2), "x").multo_unique()
+    assert uniques == M(M(1, 2), "x") and inverse == M(0, 0, 1)
+
+
+def test_encoded():
+    import pickle
+    from array import array
+    from dataclasses import dataclass
+
+    calls = []
+
+    @multo
+    def tag(s, suffix=""):
+        calls.append(s)
+        return s.upper() + suffix
+
+    m = (M("a1", "a2") + M("b1", "b2", "b1", "b2")).multo_encode()
+    assert m == M("a1b1", "a2b1", "a1b2", "a2b2", "a1b1", "a2b1", "a1b2", "a2b2")
+    assert m.multo.codes.typecode == "B" and len(m.multo.values) == 4
+    from multo import _code_typecode
+    assert [array(_code_typecode(n)).itemsize for n in (2, 1 << 8, 1 << 16 | 1, 1 << 32 | 1)] == [1, 1, 4, 8]
+
+    t = tag(m, suffix="!")
+    assert len(calls) == 4
+    assert t == M("A1B1!", "A2B1!", "A1B2!", "A2B2!", "A1B1!", "A2B1!", "A1B2!", "A2B2!")
+    assert (m + "x").multo_decode() == M(*(s + "x" for s in m.multo))
+    assert tag(m, M("?", "!")) == M(*(s.upper() + "?" for s in m.multo), *(s.upper() + "!" for s in m.multo))
+
+    @dataclass(frozen=True)
+    class word:
+        text: str
+
+        def twice(self):
+            calls.append(self)
+            return self.text * 2
+
+    del calls[:]
+    s = M(word("x"), word("y"), word("x")).multo_encode()
+    assert s.text == M("x", "y", "x") and s.multo.values == [word("x"), word("y")]
+    assert s.twice() == M("xx", "yy", "xx") and len(calls) == 2
+
+    n = (M(-1, 1, mode="nest") * M(1, 1, 1)).multo_encode()
+    assert n.multo_shape == (3, 2) and abs(n) == M(M(1, 1), M(1, 1), M(1, 1))
+    assert n.multo_view[1:].multo_sum() == 0 and n.multo_decode().multo_shape == (3, 2)
+    assert pickle.loads(pickle.dumps(n)) == n
+    assert n.multo_freeze() == n.multo_decode().multo_freeze()
+
+
+def test_product():
+    import random
+    from array import array
+    from multo import multo_product
+
+    a, b, c = M(1, 2), M(*"xyz"), M(multo=range(10**6))
+    p = multo_product(a, b, c)
+    assert len(p) == 6 * 10**6
+
+    @multo
+    def combo(x, y, z):
+        return (x, y, z)
+
+    small = multo_product(a, b, M(7, 8))
+    assert M(multo=list(small)) == combo(a, b, M(7, 8))
+    assert [small[i] for i in range(len(small))] == list(small)
+    assert list(small[3:9:2]) == list(small)[3:9:2] == [small[3], small[5], small[7]]
+    assert list(small[::-1]) == list(small)[::-1] and small[-1] == (2, "z", 8)
+    assert list(small[1::4][1:]) == list(small[5::4])
+
+    assert p[0] == (1, "x", 0) and p[1] == (2, "x", 0) and p[2] == (1, "y", 0)
+    assert p[6 * 10**6 - 1] == (2, "z", 10**6 - 1)
+    assert p.index((2, "y", 123)) == 123 * 6 + 3
+    assert (1, "z", 5) in p and (3, "z", 5) not in p and (1, "z") not in p
+    assert p[1::2].index((2, "x", 1)) == 3
+    with raises(IndexError):
+        p[6 * 10**6]
+
+    shards = [small[i::3] for i in range(3)]
+    assert sorted(x for shard in shards for x in shard) == sorted(small)
+    sample = p.sample(5, random.Random(1))
+    assert len(set(sample)) == 5 and all(s in p for s in sample)
+    assert multo(multo=small[:2]) == M((1, "x", 7), (2, "x", 7))
+
+    from multo import multo_frozen
+    mapped = multo_product(multo_frozen(1, 2), M(multo=memoryview(array('q', [3, 4]))))
+    assert mapped.index((2, 4)) == 3 and (1, 4) in mapped and (1, 5) not in mapped
+
+    # like itertools.product(), no multos make one empty combination
+    empty = multo_product()
+    assert len(empty) == 1 and empty[0] == () and list(empty) == [()] and () in empty
+    assert list(multo_product(a, M(multo=[]))) == []